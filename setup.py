@@ -20,6 +20,7 @@ setup(
     author="Francisco Muñoz",
     license="MIT",
     install_requires=install_requires,
+    extras_require={"numba": ["numba"]},
     setup_requires=["pytest-runner"],
     tests_requires=["pytest==4.4.1"],
     test_suite="tests",
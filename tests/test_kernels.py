@@ -1,7 +1,10 @@
 import functools
 from unittest import TestCase
 
+import numpy as np
+
 from tsp.kernels import *
+from tsp.utils import route_distance, nearest_neighbours, sample_coordinates, distance_matrix
 
 
 def repeat(times: int):
@@ -24,108 +27,213 @@ def repeat(times: int):
     return decorator_repeat
 
 
+def _check_delta(test_case: TestCase, kernel_cls, dist_matrix: np.ndarray):
+    """Checks the method '_delta' of a kernel against the total distances, for every pair of indices of a route."""
+    route = np.array([3, 0, 5, 1, 4, 2])
+    for i in range(len(route)):
+        for j in range(len(route)):
+            new_route = kernel_cls._sample(route, i, j)
+            expected_delta = route_distance(new_route, dist_matrix) - route_distance(route, dist_matrix)
+            test_case.assertAlmostEqual(
+                expected_delta, kernel_cls._delta(route, dist_matrix, i, j), 12,
+                f"The '_delta' method is not working with indices i={i} and j={j}."
+            )
+
+
+def _check_sample_batch(test_case: TestCase, kernel_cls):
+    """Checks that every row of the method '_sample_batch' of a kernel is equal to the result of '_sample'."""
+    route = np.array([3, 0, 5, 1, 4, 2])
+    i, j = np.array([(i, j) for i in range(len(route)) for j in range(len(route)) if i != j]).T
+    new_routes = kernel_cls._sample_batch(route, i, j)
+    for new_route, i_, j_ in zip(new_routes, i, j):
+        test_case.assertEqual(
+            kernel_cls._sample(route, i_, j_).tolist(), new_route.tolist(),
+            f"The '_sample_batch' method is not working with indices i={i_} and j={j_}."
+        )
+
+
+class TestBaseKernelTSP(TestCase):
+    def setUp(self) -> None:
+        self.kernel = SwapKernelTSP(42)
+
+    @repeat(100)
+    def test_sample_indices(self):
+        i, j = self.kernel._sample_indices(5)
+        self.assertNotEqual(i, j, "The indices must be different.")
+        self.assertTrue(
+            1 <= i < 5 and 1 <= j < 5,
+            "The indices must be between 1 and the length of the route (exclusive)."
+        )
+
+    def test_sample_route_indices_neighbours(self):
+        dist_matrix = distance_matrix(sample_coordinates(30, seed=42))
+        neighbours = nearest_neighbours(dist_matrix, 5)
+        self.assertEqual((30, 5), neighbours.shape, "The neighbour lists have a wrong shape.")
+        self.assertTrue(
+            np.all(np.take_along_axis(dist_matrix, neighbours, 1).max(axis=1) <= np.sort(dist_matrix, axis=1)[:, 5]),
+            "The neighbour lists do not contain the nearest cities."
+        )
+
+        kernel = SwapKernelTSP(42, neighbours=neighbours)
+        route = np.random.default_rng(42).permutation(30)
+        i, j = kernel._sample_route_indices_batch(route, 100)
+        for i_, j_ in [kernel._sample_route_indices(route) for _ in range(100)] + list(zip(i, j)):
+            self.assertTrue(1 <= i_ < 30 and 1 <= j_ < 30, "The indices must leave out the first city.")
+            # If the neighbour is the first city, the indices are sampled uniformly
+            self.assertTrue(
+                route[j_] in neighbours[route[i_]] or route[0] in neighbours[route[i_]],
+                "The second city is not a neighbour of the first one."
+            )
+
+
+    def test_route_positions(self):
+        dist_matrix = distance_matrix(sample_coordinates(30, seed=42))
+        neighbours = nearest_neighbours(dist_matrix, 5)
+        for kernel_cls in [SwapKernelTSP, ReversionKernelTSP, InsertionKernelTSP]:
+            kernel = kernel_cls(42, neighbours=neighbours)
+            route = np.random.default_rng(42).permutation(30)
+            kernel.sample_delta(route, dist_matrix)
+            positions = kernel._positions
+
+            for k in range(100):
+                new_route, _ = kernel.sample_delta(route, dist_matrix)
+                # Every other move is accepted
+                route = new_route if k % 2 else route
+                kernel._route_positions(route)
+                self.assertIs(
+                    positions, kernel._positions,
+                    f"The positions of '{kernel_cls.__name__}' are computed again instead of being updated."
+                )
+                np.testing.assert_array_equal(
+                    np.argsort(route), kernel._positions,
+                    f"The positions of '{kernel_cls.__name__}' do not correspond to the route."
+                )
+
+
 class TestSwapKernelTSP(TestCase):
     def setUp(self) -> None:
         self.kernel = SwapKernelTSP(42)
 
     def test_sample(self):
-        route = [i for i in range(10)]
+        route = np.arange(10)
 
         swapped_route = self.kernel._sample(route, 3, 7)
         # expected_route = [0, 1, 2, 7, 4, 5, 6, 3, 8, 9]
         expected_route = [0, 1, 2, 7, 4, 5, 6, 3, 8, 9]
 
         self.assertEqual(
-            expected_route, swapped_route,
+            expected_route, swapped_route.tolist(),
             "The '_sample' method is not working. It does not swapping as expected."
         )
         self.assertEqual(
-            [0, 1, 2, 3, 4, 5, 6, 7, 8, 9], route,
+            [0, 1, 2, 3, 4, 5, 6, 7, 8, 9], route.tolist(),
             "The original route has been modified by the '_sample' method."
         )
 
+    def test_delta(self):
+        dist_matrix = np.random.default_rng(42).uniform(size=(6, 6))
+        _check_delta(self, SwapKernelTSP, dist_matrix)
+
+    def test_sample_batch(self):
+        _check_sample_batch(self, SwapKernelTSP)
+
 
 class TestReversionKernelTSP(TestCase):
     def setUp(self) -> None:
         self.kernel = ReversionKernelTSP(42)
 
     def test_sample(self):
-        route = list(range(10))
+        route = np.arange(10)
 
         reversed_route1 = self.kernel._sample(route, 3, 7)
         expected_route1 = [0, 1, 2, 7, 6, 5, 4, 3, 8, 9]
         self.assertEqual(
-            expected_route1, reversed_route1,
+            expected_route1, reversed_route1.tolist(),
             "The '_sample' method is not working. It does not reverse as expected."
         )
 
         reversed_route2 = self.kernel._sample(route, 7, 3)
         expected_route2 = [0, 1, 2, 7, 6, 5, 4, 3, 8, 9]
         self.assertEqual(
-            expected_route2, reversed_route2,
+            expected_route2, reversed_route2.tolist(),
             "The '_sample' method is not working. It is not index-agnostic."
         )
 
         reversed_route3 = self.kernel._sample(route, 0, 5)
         expected_route3 = [5, 4, 3, 2, 1, 0, 6, 7, 8, 9]
         self.assertEqual(
-            expected_route3, reversed_route3,
+            expected_route3, reversed_route3.tolist(),
             "The '_sample' method is not working index i=0."
         )
 
         reversed_route4 = self.kernel._sample(route, 5, 9)
         expected_route4 = [0, 1, 2, 3, 4, 9, 8, 7, 6, 5]
         self.assertEqual(
-            expected_route4, reversed_route4,
+            expected_route4, reversed_route4.tolist(),
             "The '_sample' method is not working index j=last."
         )
 
         self.assertEqual(
-            [0, 1, 2, 3, 4, 5, 6, 7, 8, 9], route,
+            [0, 1, 2, 3, 4, 5, 6, 7, 8, 9], route.tolist(),
             "The original route has been modified by the '_sample' method."
         )
 
+    def test_delta(self):
+        # The reversion only computes the change from the modified edges with a symmetric matrix
+        dist_matrix = np.random.default_rng(42).uniform(size=(6, 6))
+        _check_delta(self, ReversionKernelTSP, dist_matrix + dist_matrix.T)
+
+    def test_sample_batch(self):
+        _check_sample_batch(self, ReversionKernelTSP)
+
 
 class TestInsertionKernelTSP(TestCase):
     def setUp(self) -> None:
         self.kernel = InsertionKernelTSP(42)
 
     def test_sample(self):
-        route = list(range(10))
+        route = np.arange(10)
 
         inserted_route1 = self.kernel._sample(route, 3, 7)
         expected_route1 = [0, 1, 2, 4, 5, 6, 7, 3, 8, 9]
         self.assertEqual(
-            expected_route1, inserted_route1,
+            expected_route1, inserted_route1.tolist(),
             "The '_sample' method is not working. Test 1."
         )
 
         inserted_route2 = self.kernel._sample(route, 7, 3)
         expected_route2 = [0, 1, 2, 7, 3, 4, 5, 6, 8, 9]
         self.assertEqual(
-            expected_route2, inserted_route2,
+            expected_route2, inserted_route2.tolist(),
             "The '_sample' method is not working. Test 2."
         )
 
         inserted_route3 = self.kernel._sample(route, 0, 5)
         expected_route3 = [1, 2, 3, 4, 5, 0, 6, 7, 8, 9]
         self.assertEqual(
-            expected_route3, inserted_route3,
+            expected_route3, inserted_route3.tolist(),
             "The '_sample' method is not working index i=0."
         )
 
         inserted_route4 = self.kernel._sample(route, 5, 9)
         expected_route4 = [0, 1, 2, 3, 4, 6, 7, 8, 9, 5]
         self.assertEqual(
-            expected_route4, inserted_route4,
+            expected_route4, inserted_route4.tolist(),
             "The '_sample' method is not working index j=last."
         )
 
         self.assertEqual(
-            [0, 1, 2, 3, 4, 5, 6, 7, 8, 9], route,
+            [0, 1, 2, 3, 4, 5, 6, 7, 8, 9], route.tolist(),
             "The original route has been modified by the '_sample' method."
         )
 
+    def test_delta(self):
+        dist_matrix = np.random.default_rng(42).uniform(size=(6, 6))
+        _check_delta(self, InsertionKernelTSP, dist_matrix)
+
+    def test_sample_batch(self):
+        _check_sample_batch(self, InsertionKernelTSP)
+
 
 class TestRandomWalkKernelTSP(TestCase):
     def setUp(self) -> None:
@@ -133,25 +241,34 @@ class TestRandomWalkKernelTSP(TestCase):
 
     @repeat(20)
     def test_sample(self):
-        route = [0, 1, 2]
+        route = np.arange(3)
         # The possible permutations of this route are:
         # [0, 1, 2], [0, 2, 1], [1, 0, 2], [1, 2, 0], [2, 0, 1], [2, 1, 0]
         # Removing circular permutations: [0, 1, 2] -> [2, 0, 1] -> [1, 2, 0]
         # And the possible options are: [0, 2, 1]; [1, 0, 2]; [2, 1, 0]
         new_route = self.kernel(route)
         self.assertNotEqual(
-            [0, 1, 2], new_route,
+            [0, 1, 2], new_route.tolist(),
             "The 'new_route' must be different of the original route."
         )
         self.assertNotEqual(
-            [2, 0, 1], new_route,
+            [2, 0, 1], new_route.tolist(),
             "The 'new_route' must be different of the original route permutation 1."
         )
         self.assertNotEqual(
-            [1, 2, 0], new_route,
+            [1, 2, 0], new_route.tolist(),
             "The 'new_route' must be different of the original route permutation 2."
         )
 
+    def test_sample_first_city(self):
+        route = np.array([3, 0, 5, 1, 4, 2])
+        new_route = self.kernel(route)
+        self.assertEqual(3, new_route[0], "The first city must be kept fixed.")
+        self.assertEqual(
+            sorted(route.tolist()), sorted(new_route.tolist()),
+            "The 'new_route' must be a permutation of the original route."
+        )
+
 
 class TestMixingKernelTSP(TestCase):
     def setUp(self) -> None:
@@ -210,3 +327,21 @@ class TestMixingKernelTSP(TestCase):
             kernel5, expected_class,
             "The method '_choose_kernel' does not work. test5"
         )
+
+    def test_set_rng(self):
+        rng = np.random.default_rng(0)
+        self.kernel.set_rng(rng)
+        self.assertIs(self.kernel.rng, rng, "The method 'set_rng' does not set the generator of the kernel.")
+        for kernel in self.kernel.kernels:
+            self.assertIs(kernel.rng, rng, "The method 'set_rng' does not set the generator of the sub-kernels.")
+
+    def test_sample_batch(self):
+        route = np.arange(10)
+        new_routes = self.kernel.sample_batch(route, 50)
+        self.assertEqual((50, 10), new_routes.shape, "The method 'sample_batch' returns a wrong shape.")
+        for new_route in new_routes:
+            self.assertEqual(
+                route.tolist(), sorted(new_route.tolist()),
+                "The method 'sample_batch' must return permutations of the route."
+            )
+            self.assertEqual(0, new_route[0], "The method 'sample_batch' must keep the first city fixed.")
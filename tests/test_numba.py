@@ -0,0 +1,93 @@
+import unittest
+from unittest import TestCase
+
+import numpy as np
+
+from tsp import _numba
+from tsp.kernels import *
+from tsp.sa import SimulatedAnnealingTSP
+from tsp.utils import njit, route_distance, nearest_neighbours, sample_coordinates, distance_matrix
+
+
+@unittest.skipIf(njit is None, "Numba is not installed.")
+class TestCompiledLoop(TestCase):
+    def setUp(self) -> None:
+        self.route = np.array([3, 0, 5, 1, 4, 2], dtype=np.int32)
+        self.dist_matrix = distance_matrix(sample_coordinates(6, seed=42))
+
+    def test_moves(self):
+        deltas = [_numba._swap_delta, _numba._reversion_delta, _numba._insertion_delta]
+        for code, kernel_cls in enumerate([SwapKernelTSP, ReversionKernelTSP, InsertionKernelTSP]):
+            for i in range(len(self.route)):
+                for j in range(len(self.route)):
+                    expected_route = kernel_cls._sample(self.route, i, j)
+                    new_route = self.route.copy()
+                    positions = np.argsort(self.route)
+                    _numba._apply(new_route, positions, code, i, j)
+                    self.assertEqual(
+                        expected_route.tolist(), new_route.tolist(),
+                        f"The compiled move of '{kernel_cls.__name__}' is not working with indices i={i} and j={j}."
+                    )
+                    self.assertEqual(
+                        np.argsort(new_route).tolist(), positions.tolist(),
+                        f"The compiled move of '{kernel_cls.__name__}' does not update the positions with indices"
+                        f" i={i} and j={j}."
+                    )
+                    expected_delta = (route_distance(expected_route, self.dist_matrix)
+                                      - route_distance(self.route, self.dist_matrix))
+                    self.assertAlmostEqual(
+                        expected_delta, deltas[code](self.route, self.dist_matrix, i, j), 12,
+                        f"The compiled delta of '{kernel_cls.__name__}' is not working with indices i={i} and j={j}."
+                    )
+
+    def test_kernel_codes(self):
+        self.assertIsNotNone(
+            _numba.kernel_codes(MixingKernelTSP([(0.5, SwapKernelTSP()), (0.5, InsertionKernelTSP())])),
+            "A mixing of swaps and insertions must be compiled."
+        )
+        self.assertIsNone(_numba.kernel_codes(RandomWalkKernelTSP()), "The random walk kernel cannot be compiled.")
+        neighbours = nearest_neighbours(self.dist_matrix, 3)
+        self.assertEqual(
+            [_numba._KERNEL_CODES[SwapKernelTSP] + _numba._NEIGHBOURS_CODE],
+            _numba.kernel_codes(SwapKernelTSP(neighbours=neighbours)).tolist(),
+            "A kernel with neighbour lists must be compiled."
+        )
+        self.assertIsNone(
+            _numba.kernel_codes(MixingKernelTSP([
+                (0.5, SwapKernelTSP(neighbours=neighbours)),
+                (0.5, InsertionKernelTSP(neighbours=nearest_neighbours(self.dist_matrix, 2))),
+            ])),
+            "The kernels with different neighbour lists cannot be compiled together."
+        )
+
+    def test_run_neighbours(self):
+        dist_matrix = distance_matrix(sample_coordinates(30, seed=42))
+        neighbours = nearest_neighbours(dist_matrix, 5)
+        kernel = MixingKernelTSP([(0.5, ReversionKernelTSP(42, neighbours=neighbours)), (0.5, SwapKernelTSP(42))])
+        model_sa = SimulatedAnnealingTSP(dist_matrix, n_iter=5_000, kernel=kernel, seed=42)
+        model_sa.run()
+
+        self.assertAlmostEqual(
+            model_sa.dist_route(model_sa._last_route), model_sa._last_value, 10,
+            "The last value does not correspond to the distance of the last route with neighbour lists."
+        )
+        self.assertEqual(
+            list(range(30)), sorted(model_sa.best_route.tolist()),
+            "The best route is not a permutation of the cities with neighbour lists."
+        )
+
+    def test_run(self):
+        model_sa = SimulatedAnnealingTSP(
+            distance_matrix(sample_coordinates(20, seed=42)), n_iter=5_000, kernel=ReversionKernelTSP(42), seed=42
+        )
+        model_sa.run()
+
+        self.assertAlmostEqual(
+            model_sa.dist_route(model_sa.best_route), model_sa.best_value, 10,
+            "The best value does not correspond to the distance of the best route."
+        )
+        self.assertAlmostEqual(
+            model_sa.dist_route(model_sa._last_route), model_sa._last_value, 10,
+            "The last value does not correspond to the distance of the last route."
+        )
+        self.assertEqual(len(model_sa.values), len(model_sa.accept_prob), "The statistics have different lengths.")
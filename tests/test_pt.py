@@ -0,0 +1,50 @@
+from unittest import TestCase
+
+import numpy as np
+
+from tsp.kernels import *
+from tsp.pt import ParallelTemperingTSP
+from tsp.utils import sample_coordinates, distance_matrix
+
+
+class TestParallelTemperingTSP(TestCase):
+    def setUp(self) -> None:
+        self.dist_matrix = distance_matrix(sample_coordinates(20, seed=42))
+        self.kernel = MixingKernelTSP(
+            [(0.5, SwapKernelTSP(42)),
+             (0.5, ReversionKernelTSP(42))],
+            seed=42,
+        )
+
+    def test_run(self):
+        model_pt = ParallelTemperingTSP(
+            self.dist_matrix, temps=[0.1, 0.001, 0.01], n_rounds=50, swap_interval=50, kernel=self.kernel, seed=42
+        )
+        model_pt.run()
+
+        np.testing.assert_array_equal([0.001, 0.01, 0.1], model_pt.temps, "The temperatures are not sorted.")
+        self.assertAlmostEqual(
+            model_pt.replicas[0].dist_route(model_pt.best_route), model_pt.best_value, 10,
+            "The best value does not correspond to the distance of the best route."
+        )
+        self.assertEqual(
+            list(range(20)), sorted(model_pt.best_route.tolist()),
+            "The best route is not a permutation of the cities."
+        )
+        for replica in model_pt.replicas:
+            self.assertAlmostEqual(
+                replica.dist_route(replica._last_route), replica._last_value, 10,
+                "The last value of a replica does not correspond to its last route after the exchanges."
+            )
+        self.assertTrue(np.all(model_pt.swap_ratio > 0), "No exchange was accepted between the replicas.")
+        self.assertEqual(2_500, len(model_pt.replicas[0].values), "The coldest replica must store its statistics.")
+        self.assertEqual(0, len(model_pt.replicas[1].values), "Only the coldest replica must store its statistics.")
+
+    def test_replicas_share_distance_matrix(self):
+        model_pt = ParallelTemperingTSP(self.dist_matrix, n_rounds=1, kernel=self.kernel, seed=42)
+
+        for replica in model_pt.replicas:
+            self.assertIs(
+                model_pt.dist_matrix, replica.dist_matrix, "The replicas must share the distance matrix."
+            )
+            self.assertIsNot(self.kernel, replica.kernel, "Each replica must have its own kernel.")
@@ -0,0 +1,196 @@
+import math
+from unittest import TestCase
+
+import numpy as np
+
+from tsp.kernels import *
+from tsp.sa import SimulatedAnnealingTSP
+from tsp.utils import sample_coordinates, distance_matrix
+
+
+class ProtocolKernelTSP:
+    """A kernel that only implements the protocol :py:class:`tsp.kernels.KernelTSP`."""
+    def __init__(self, seed=None):
+        self.rng = np.random.default_rng(seed)
+
+    def sample(self, route):
+        i, j = self.rng.choice(np.arange(1, len(route)), size=2, replace=False)
+        new_route = route.copy()
+        new_route[i], new_route[j] = route[j], route[i]
+        return new_route
+
+    def __call__(self, route):
+        return self.sample(route)
+
+
+class TestSimulatedAnnealingTSP(TestCase):
+    def setUp(self) -> None:
+        self.dist_matrix = distance_matrix(sample_coordinates(20, seed=42))
+        self.kernel = MixingKernelTSP(
+            [(0.3, SwapKernelTSP(42)),
+             (0.4, ReversionKernelTSP(42)),
+             (0.3, InsertionKernelTSP(42))],
+            seed=42,
+        )
+
+    def test_run(self):
+        model_sa = SimulatedAnnealingTSP(self.dist_matrix, n_iter=5_000, kernel=self.kernel, seed=42)
+        model_sa.run()
+
+        self.assertAlmostEqual(
+            model_sa.dist_route(model_sa.best_route), model_sa.best_value, 10,
+            "The best value does not correspond to the distance of the best route."
+        )
+        self.assertEqual(
+            list(range(20)), sorted(model_sa.best_route.tolist()),
+            "The best route is not a permutation of the cities."
+        )
+
+    def test_from_coords(self):
+        coords = sample_coordinates(20, seed=42)
+        model_sa = SimulatedAnnealingTSP.from_coords(coords, n_iter=1_000, seed=42, dtype=np.float32)
+
+        self.assertEqual(np.float32, model_sa.dist_matrix.dtype, "The parameters are not passed to the initialiser.")
+        np.testing.assert_allclose(
+            self.dist_matrix / np.max(self.dist_matrix), model_sa.dist_matrix, rtol=1e-6,
+            err_msg="The distance matrix does not correspond to the coordinates."
+        )
+
+    def test_run_protocol_kernel(self):
+        asymmetric_matrix = self.dist_matrix + np.random.default_rng(42).uniform(size=self.dist_matrix.shape)
+        kernels = [ProtocolKernelTSP(42), MixingKernelTSP([(0.5, ProtocolKernelTSP(42)), (0.5, SwapKernelTSP(42))])]
+        for dist_matrix in [self.dist_matrix, asymmetric_matrix]:
+            for kernel in kernels:
+                model_sa = SimulatedAnnealingTSP(dist_matrix, n_iter=1_000, kernel=kernel, seed=42)
+                model_sa.run()
+
+                self.assertAlmostEqual(
+                    model_sa.dist_route(model_sa.best_route), model_sa.best_value, 10,
+                    "The best value does not correspond to the distance of the best route with a kernel that only"
+                    " implements the protocol."
+                )
+
+    def test_independent_streams(self):
+        # The kernel and the acceptance draws must not repeat the same numbers, even if the kernel has the same seed
+        for kernel in [None, SwapKernelTSP(42)]:
+            model_sa = SimulatedAnnealingTSP(self.dist_matrix, kernel=kernel, seed=42)
+            i, _ = model_sa.kernel._sample_indices_batch(20, 2_000)
+            u = model_sa.rng.uniform(size=1_000)
+
+            self.assertLess(
+                abs(np.corrcoef(i[1::2], u)[0, 1]), 0.2,
+                "The indices of the kernel are correlated with the acceptance draws."
+            )
+
+    def test_sample_batch_protocol_kernel(self):
+        kernel = MixingKernelTSP([(0.5, ProtocolKernelTSP(42)), (0.5, SwapKernelTSP(42))], seed=42)
+        new_routes = kernel.sample_batch(np.arange(20), 50)
+
+        self.assertEqual(
+            [list(range(20))] * 50, np.sort(new_routes, axis=1).tolist(),
+            "The mixing kernel does not sample a batch with a kernel that only implements the protocol."
+        )
+
+    def test_run_asymmetric(self):
+        dist_matrix = self.dist_matrix + np.random.default_rng(42).uniform(size=self.dist_matrix.shape)
+        model_sa = SimulatedAnnealingTSP(dist_matrix, n_iter=5_000, kernel=self.kernel, seed=42)
+        model_sa.run()
+
+        self.assertAlmostEqual(
+            model_sa.dist_route(model_sa.best_route), model_sa.best_value, 10,
+            "The best value does not correspond to the distance of the best route with an asymmetric matrix."
+        )
+
+    def test_run_float32(self):
+        model_sa = SimulatedAnnealingTSP(self.dist_matrix, n_iter=5_000, kernel=self.kernel, seed=42, dtype=np.float32)
+        model_sa.run()
+
+        self.assertEqual(np.float32, model_sa.dist_matrix.dtype, "The distance matrix is not stored in float32.")
+        self.assertAlmostEqual(
+            model_sa.dist_route(model_sa.best_route), model_sa.best_value, 5,
+            "The best value does not correspond to the distance of the best route in single precision."
+        )
+
+    def test_statistics_after_resuming(self):
+        model_sa = SimulatedAnnealingTSP(self.dist_matrix, n_iter=1_000, kernel=self.kernel, seed=42, early_stop=False)
+        model_sa.run()
+        self.assertEqual(1_000, len(model_sa.accept_prob), "The statistics do not cover the iterations of the run.")
+
+        model_sa.run()
+        self.assertEqual(
+            2_000, len(model_sa.accept_prob),
+            "The statistics are not updated after resuming the algorithm."
+        )
+        self.assertEqual(
+            2_000, len(model_sa.abs_min_values),
+            "The statistics are not updated after resuming the algorithm."
+        )
+
+    def test_run_without_statistics(self):
+        # Both instances use the default kernel with the same seed
+        model_sa = SimulatedAnnealingTSP(self.dist_matrix, n_iter=5_000, seed=42, early_stop=False, track_stats=False)
+        model_sa.run()
+        model_sa_stats = SimulatedAnnealingTSP(self.dist_matrix, n_iter=5_000, seed=42, early_stop=False)
+        model_sa_stats.run()
+
+        self.assertEqual(0, len(model_sa.values), "The statistics must not be stored.")
+        self.assertEqual(
+            model_sa_stats.best_value, model_sa.best_value,
+            "The statistics must not change the result of the algorithm."
+        )
+
+    def test_run_scalar_cooling_schedule(self):
+        # A cooling schedule that cannot be evaluated over an array of iterations
+        model_sa = SimulatedAnnealingTSP(
+            self.dist_matrix, n_iter=1_000, kernel=self.kernel, seed=42, cooling_schedule=lambda k: math.exp(-k / 100)
+        )
+        model_sa.run()
+
+        self.assertEqual(
+            list(range(20)), sorted(model_sa.best_route.tolist()),
+            "The algorithm does not work with a cooling schedule for scalars only."
+        )
+
+    def test_run_chains(self):
+        model_sa = SimulatedAnnealingTSP(self.dist_matrix, n_iter=1_000, kernel=self.kernel, seed=42)
+        best_chain = model_sa.run_chains(2, max_workers=2)
+
+        self.assertIsNone(model_sa.best_route, "The instance must not be modified by the chains.")
+        self.assertEqual(
+            2, model_sa.rng.bit_generator.seed_seq.n_children_spawned,
+            "The generators of the chains must be spawned from the seed sequence of the instance."
+        )
+        np.testing.assert_array_equal(
+            model_sa.dist_matrix, best_chain.dist_matrix, "The best chain does not have the distance matrix."
+        )
+        self.assertAlmostEqual(
+            best_chain.dist_route(best_chain.best_route), best_chain.best_value, 10,
+            "The best value of the chain does not correspond to the distance of its best route."
+        )
+
+    def test_run_chains_protocol_kernel(self):
+        kernel = MixingKernelTSP([(0.5, ProtocolKernelTSP(42)), (0.5, SwapKernelTSP(42))], seed=42)
+        for k in [ProtocolKernelTSP(42), kernel]:
+            model_sa = SimulatedAnnealingTSP(self.dist_matrix, n_iter=1_000, kernel=k, seed=42)
+            best_chain = model_sa.run_chains(2, max_workers=2)
+
+            self.assertAlmostEqual(
+                best_chain.dist_route(best_chain.best_route), best_chain.best_value, 10,
+                "The chains do not work with a kernel that only implements the protocol."
+            )
+
+    def test_run_chains_threads(self):
+        # The generators of the chains are spawned from the seed, so both instances give the same chains
+        model_sa = SimulatedAnnealingTSP(self.dist_matrix, n_iter=1_000, kernel=self.kernel, seed=42)
+        best_chain_threads = model_sa.run_chains(2, max_workers=2, threads=True)
+        model_sa = SimulatedAnnealingTSP(self.dist_matrix, n_iter=1_000, kernel=self.kernel, seed=42)
+        best_chain_processes = model_sa.run_chains(2, max_workers=2)
+
+        self.assertEqual(
+            best_chain_processes.best_value, best_chain_threads.best_value,
+            "The chains in threads do not give the same result as the chains in processes."
+        )
+        self.assertIsNot(
+            model_sa.dist_matrix, best_chain_threads.dist_matrix,
+            "The best chain must not share the distance matrix of the instance."
+        )
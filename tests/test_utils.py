@@ -0,0 +1,46 @@
+from unittest import TestCase
+
+import numpy as np
+
+from tsp.utils import route_distance, sample_coordinates, greedy_route, _route_distance_numpy, _route_distance_loop
+
+
+class TestRouteDistance(TestCase):
+    def setUp(self) -> None:
+        rng = np.random.default_rng(42)
+        self.dist_matrix = rng.uniform(size=(10, 10))
+        self.route = rng.permutation(10).astype(np.int32)
+
+    def test_route_distance(self):
+        expected = sum(self.dist_matrix[self.route[k], self.route[(k + 1) % 10]] for k in range(10))
+        self.assertAlmostEqual(expected, route_distance(self.route, self.dist_matrix), 12,
+                               "The function 'route_distance' does not compute the distance of the closed route.")
+
+    def test_implementations(self):
+        # The NumPy fallback and the loop compiled with Numba must agree
+        self.assertAlmostEqual(
+            _route_distance_numpy(self.route, self.dist_matrix), _route_distance_loop(self.route, self.dist_matrix), 12,
+            "The implementations of 'route_distance' do not agree."
+        )
+
+
+class TestSampleCoordinates(TestCase):
+    def test_sample_coordinates(self):
+        coords = sample_coordinates(1_000, lb=2, ub=5, seed=42)
+        self.assertEqual((1_000, 2), coords.shape, "The coordinates have a wrong shape.")
+        self.assertEqual(
+            list(range(2, 6)), np.unique(coords).tolist(),
+            "The coordinates must cover the grid between both bounds (inclusive)."
+        )
+
+
+class TestGreedyRoute(TestCase):
+    def test_greedy_route(self):
+        # Cities on a line, given in a shuffled order
+        positions = np.array([0., 3., 1., 4., 2.])
+        dist_matrix = np.abs(positions[:, None] - positions[None, :])
+
+        np.testing.assert_array_equal(
+            [0, 2, 4, 1, 3], greedy_route(dist_matrix),
+            "The route does not always go to the nearest city not visited yet."
+        )
@@ -1 +1,2 @@
 from .sa import SimulatedAnnealingTSP
+from .pt import ParallelTemperingTSP
@@ -0,0 +1,210 @@
+"""
+Compiled version of the annealing loop, used by :py:meth:`tsp.sa.SimulatedAnnealingTSP.run` when Numba is installed.
+It covers the kernels that move a pair of cities (and mixtures of them, with or without neighbour lists), on symmetric
+distance matrices. The random numbers are drawn in blocks by the kernels and the model, so the compiled loop only reads
+them.
+"""
+from typing import Optional
+
+import numpy as np
+
+from tsp.kernels import KernelTSP, SwapKernelTSP, ReversionKernelTSP, InsertionKernelTSP, MixingKernelTSP
+from tsp.utils import njit, _route_distance_loop
+
+_KERNEL_CODES = {SwapKernelTSP: 0, ReversionKernelTSP: 1, InsertionKernelTSP: 2}
+"""Code of each kernel in the compiled loop."""
+
+_NEIGHBOURS_CODE = len(_KERNEL_CODES)
+"""Shift of the code of a kernel with neighbour lists (see :py:class:`tsp.kernels.BaseKernelTSP`)."""
+
+
+def kernel_codes(kernel: KernelTSP) -> Optional[np.ndarray]:
+    """
+    Returns the codes of the kernels that ``kernel`` is composed of (a single one if it is not a mixing kernel), in
+    the order of its probabilities. Returns None if the compiled loop cannot run this kernel, or if Numba is not
+    installed. The kernels with neighbour lists must share the same lists (see :py:func:`kernel_neighbours`).
+    """
+    if njit is None:
+        return None
+    kernels = kernel.kernels if type(kernel) is MixingKernelTSP else [kernel]
+    if type(kernel) is MixingKernelTSP and kernel.neighbours is not None:
+        return None
+    codes = []
+    neighbours = None
+    for kernel_ in kernels:
+        if type(kernel_) not in _KERNEL_CODES:
+            return None
+        code = _KERNEL_CODES[type(kernel_)]
+        if kernel_.neighbours is not None:
+            if neighbours is not None and not np.array_equal(neighbours, kernel_.neighbours):
+                return None
+            neighbours = kernel_.neighbours
+            code += _NEIGHBOURS_CODE
+        codes.append(code)
+    return np.array(codes, dtype=np.int8)
+
+
+def kernel_neighbours(kernel: KernelTSP) -> np.ndarray:
+    """
+    Returns the neighbour lists of the kernels that ``kernel`` is composed of, whose codes are given by
+    :py:func:`kernel_codes`. It is an empty array if none of them has neighbour lists.
+    """
+    kernels = kernel.kernels if type(kernel) is MixingKernelTSP else [kernel]
+    for kernel_ in kernels:
+        if kernel_.neighbours is not None:
+            return np.ascontiguousarray(kernel_.neighbours, dtype=np.intp)
+    return np.empty((0, 1), dtype=np.intp)
+
+
+def sample_moves(
+        kernel: KernelTSP, codes: np.ndarray, neighbours: np.ndarray, len_route: int, size: int
+) -> tuple[np.ndarray, ...]:
+    """
+    Samples the moves of ``size`` iterations with ``kernel``, whose codes and neighbour lists are given by
+    :py:func:`kernel_codes` and :py:func:`kernel_neighbours`. Returns the code of the kernel, the pair of indices and
+    the column of the neighbour lists of each iteration. The neighbour of a city depends on the route of the
+    iteration, so the second index is only used by the kernels with neighbour lists if that neighbour is the first
+    city of the route.
+    """
+    i, j = kernel._sample_indices_batch(len_route, size)
+    slots = kernel.rng.integers(neighbours.shape[1], size=size) if len(neighbours) else np.empty(0, dtype=np.intp)
+    if len(codes) == 1:
+        return np.full(size, codes[0]), i, j, slots
+    # The kernel of each iteration is chosen as in `MixingKernelTSP._choose_kernel`
+    choices = np.searchsorted(kernel._cumsum_p[1:-1], kernel.rng.uniform(size=size), side="right")
+    return codes[choices], i, j, slots
+
+
+def _swap_delta(route, dist_matrix, i, j):
+    n = len(route)
+    i, j = min(i, j), max(i, j)
+    if i == j:
+        return 0.
+    a, b, c, d = route[i - 1], route[i], route[j], route[(j + 1) % n]
+    if j - i == 1:
+        # Adjacent cities: only the outer edges change
+        return (np.float64(dist_matrix[a, c]) + dist_matrix[b, d]) - (np.float64(dist_matrix[a, b]) + dist_matrix[c, d])
+    if j - i == n - 1:
+        # The cities are adjacent through the end of the route
+        e, f = route[j - 1], route[i + 1]
+        return (np.float64(dist_matrix[e, b]) + dist_matrix[c, f]) - (np.float64(dist_matrix[e, c]) + dist_matrix[b, f])
+    e, f = route[i + 1], route[j - 1]
+    new = np.float64(dist_matrix[a, c]) + dist_matrix[c, e] + dist_matrix[f, b] + dist_matrix[b, d]
+    old = np.float64(dist_matrix[a, b]) + dist_matrix[b, e] + dist_matrix[f, c] + dist_matrix[c, d]
+    return new - old
+
+
+def _reversion_delta(route, dist_matrix, i, j):
+    n = len(route)
+    i, j = min(i, j), max(i, j)
+    if j - i == n - 1:
+        return 0.
+    a, b, c, d = route[i - 1], route[i], route[j], route[(j + 1) % n]
+    return (np.float64(dist_matrix[a, c]) + dist_matrix[b, d]) - (np.float64(dist_matrix[a, b]) + dist_matrix[c, d])
+
+
+def _insertion_delta(route, dist_matrix, i, j):
+    n = len(route)
+    if i == j or abs(i - j) == n - 1:
+        return 0.
+    prev_city, city, next_city = route[i - 1], route[i], route[(i + 1) % n]
+    if i < j:
+        a, b = route[j], route[(j + 1) % n]
+    else:
+        a, b = route[j - 1], route[j]
+    removed = np.float64(dist_matrix[prev_city, next_city]) - dist_matrix[prev_city, city]
+    removed -= dist_matrix[city, next_city]
+    inserted = np.float64(dist_matrix[a, city]) + dist_matrix[city, b] - dist_matrix[a, b]
+    return removed + inserted
+
+
+def _apply(route, positions, code, i, j):
+    """Applies the move of the kernel ``code`` in place, and updates the position of each city in the route."""
+    if code == 0:
+        route[i], route[j] = route[j], route[i]
+        positions[route[i]], positions[route[j]] = i, j
+    elif code == 1:
+        i, j = min(i, j), max(i, j)
+        while i < j:
+            route[i], route[j] = route[j], route[i]
+            positions[route[i]], positions[route[j]] = i, j
+            i += 1
+            j -= 1
+    else:
+        city = route[i]
+        if i < j:
+            for p in range(i, j):
+                route[p] = route[p + 1]
+                positions[route[p]] = p
+        else:
+            for p in range(i, j, -1):
+                route[p] = route[p - 1]
+                positions[route[p]] = p
+        route[j] = city
+        positions[city] = j
+
+
+def anneal(
+        route, positions, dist_route, dist_matrix, neighbours, codes, i, j, slots, uniforms, inv_temps, k_start,
+        n_accept, stop_counter, stop_after, early_stop, resync_every, best_route, best_value, values,
+        log_accept_probs, accept_ratios, stats_offset,
+):
+    """
+    Executes the iterations ``k_start, ..., k_start + len(codes) - 1`` of the algorithm, modifying ``route``,
+    ``positions`` (the position of each city in ``route``) and ``best_route`` in place. The moves, acceptance number
+    and inverse temperature of each iteration are given by :py:func:`sample_moves`, ``uniforms`` and ``inv_temps``.
+    Returns the number of iterations executed, the distance of the route, the number of acceptances, the stop
+    counter and the best value. The statistics of the iteration ``k`` are written at the position ``k - stats_offset``.
+    """
+    for t in range(len(codes)):
+        k = k_start + t
+        stop_counter += 1
+        if k % resync_every == 0:
+            dist_route = _route_distance(route, dist_matrix)
+
+        code, i_, j_ = codes[t], i[t], j[t]
+        if code >= _NEIGHBOURS_CODE:
+            # The second city is a neighbour of the first one, unless it is the first city of the route (which is
+            # kept fixed)
+            code -= _NEIGHBOURS_CODE
+            j_neighbour = positions[neighbours[route[i_], slots[t]]]
+            if j_neighbour != 0:
+                j_ = j_neighbour
+        if code == 0:
+            gap = _swap_delta(route, dist_matrix, i_, j_)
+        elif code == 1:
+            gap = _reversion_delta(route, dist_matrix, i_, j_)
+        else:
+            gap = _insertion_delta(route, dist_matrix, i_, j_)
+        dist_new_route = dist_route + gap
+        values[k - stats_offset + 1] = dist_new_route
+
+        log_accept_prob = 0. if gap <= 0 else -gap * inv_temps[t]
+        log_accept_probs[k - stats_offset] = log_accept_prob
+
+        if log_accept_prob >= 0 or uniforms[t] <= np.exp(log_accept_prob):
+            stop_counter = 0
+            n_accept += 1
+            _apply(route, positions, code, i_, j_)
+            dist_route = dist_new_route
+            if dist_route < best_value:
+                best_value = dist_route
+                best_route[:] = route
+
+        accept_ratios[k - stats_offset] = n_accept / (k + 1)
+
+        if early_stop and stop_counter >= stop_after:
+            return t + 1, dist_route, n_accept, stop_counter, best_value
+    return len(codes), dist_route, n_accept, stop_counter, best_value
+
+
+_route_distance = _route_distance_loop
+
+if njit is not None:
+    _route_distance = njit(cache=True)(_route_distance)
+    _swap_delta = njit(cache=True)(_swap_delta)
+    _reversion_delta = njit(cache=True)(_reversion_delta)
+    _insertion_delta = njit(cache=True)(_insertion_delta)
+    _apply = njit(cache=True)(_apply)
+    # The GIL is released, so the chains of `SimulatedAnnealingTSP.run_chains` can run it in parallel threads
+    anneal = njit(cache=True, nogil=True)(anneal)
@@ -1,11 +1,11 @@
 import abc
-import copy
+import bisect
 from typing import Protocol, Optional
 
 import numpy as np
 from numpy.random import Generator
 
-from tsp.utils import _GeneratorLike, _Route, _EPS
+from tsp.utils import _GeneratorLike, _Route, _EPS, route_distance
 
 __all__ = [
     "KernelTSP",
@@ -17,6 +17,9 @@ __all__ = [
     "MixingKernelTSP",
 ]
 
+_RNG_BLOCK = 1 << 12
+"""Number of random numbers drawn at once by the kernels."""
+
 _sample_doc = """
         Samples a new route, using the previous route. You can call the instance to obtain the same effect.
     
@@ -24,6 +27,23 @@ _sample_doc = """
         :return: Modified route.
         """
 
+_sample_delta_doc = """
+        Samples a new route, using the previous route, together with the change of the total distance. The kernels
+        that only modify a few edges of the route compute the change from those edges, assuming that the distance
+        matrix is symmetric.
+
+        :param route: Previous route.
+        :param dist_matrix: Matrix of distances.
+        :return: Modified route and the difference between its total distance and the one of the previous route.
+        """
+
+_set_rng_doc = """
+        Replaces the generator of the kernel (and of the kernels it is composed of, if any) by ``rng``, so that a
+        single generator drives all the draws of a chain.
+
+        :param rng: The new generator.
+        """
+
 _call_doc = """Alias for :py:method:`sample`"""
 
 
@@ -31,6 +51,10 @@ class KernelTSP(Protocol):
     """
     Protocol class used to generalise the behaviour of sampling new routes.
     It is used in the :py:class:`tsp.sa.SimulatedAnnealingTSP`.
+
+    A kernel may also implement :py:meth:`BaseKernelTSP.sample_delta`, to compute the change of the total distance
+    of its routes faster (otherwise, the whole routes are evaluated), and :py:meth:`BaseKernelTSP.set_rng` (otherwise,
+    its attribute ``rng`` is replaced).
     """
     rng: Generator
     """The generator of the instance."""
@@ -47,21 +71,158 @@ class BaseKernelTSP(metaclass=abc.ABCMeta):
     Abstract class used to generalise the behaviour of sampling new routes.
     It is used in the :py:class:`tsp.sa.SimulatedAnnealingTSP`.
     """
-    rng: Generator
-    """The generator of the instance."""
+    # The kernels are called at every iteration, so their attributes are stored in slots instead of a dictionary
+    __slots__ = (
+        "_rng", "neighbours", "_index_buffer", "_index_buffer_len", "_uniform_buffer", "_positions", "_positions_route",
+        "_last_move",
+    )
 
-    def __init__(self, seed: _GeneratorLike = None):
-        self.rng: Generator = np.random.default_rng(seed)
+    def __init__(self, seed: _GeneratorLike = None, neighbours: Optional[np.ndarray] = None):
+        """
+        Class initialiser.
+
+        :param seed: The seed or generator.
+        :param neighbours: Array of shape ``(n_cities, k)`` with the nearest neighbours of each city, as returned by
+            :py:func:`tsp.utils.nearest_neighbours`. If it is given, the kernels that move a pair of cities choose the
+            second one among the neighbours of the first, since moves between far cities are almost always rejected.
+        """
+        self.rng = np.random.default_rng(seed)
+        self.neighbours: Optional[np.ndarray] = None if neighbours is None else np.asarray(neighbours)
+        # The positions of the cities in the last route, used with the neighbour lists (see `_route_positions`)
+        self._positions: Optional[np.ndarray] = None
+        self._positions_route: Optional[_Route] = None
+        self._last_move: Optional[tuple[_Route, int, int]] = None
+
+    @property
+    def rng(self) -> Generator:
+        """The generator of the instance."""
+        return self._rng
+
+    @rng.setter
+    def rng(self, rng: Generator):
+        self._rng = rng
+        # The numbers drawn in advance with the previous generator are discarded
+        self._index_buffer: list[tuple[int, int]] = []
+        self._index_buffer_len: int = 0
+        self._uniform_buffer: list[float] = []
+
+    def _sample_indices(self, len_route: int) -> tuple[int, int]:
+        """
+        Samples two different indices of a route of length ``len_route``, leaving out the index 0 (the first city is
+        kept fixed). The second index is drawn from the remaining ones, so no rejection is needed. The pairs are drawn
+        in blocks of ``_RNG_BLOCK``, since a call to the generator costs far more than reading a list.
+        """
+        if not self._index_buffer or self._index_buffer_len != len_route:
+            i, j = self._sample_indices_batch(len_route, _RNG_BLOCK)
+            self._index_buffer = list(zip(i.tolist(), j.tolist()))
+            self._index_buffer_len = len_route
+        return self._index_buffer.pop()
+
+    def _uniform(self) -> float:
+        """Samples a number uniformly in :math:`[0, 1)`. They are drawn in blocks, as in :py:meth:`_sample_indices`."""
+        if not self._uniform_buffer:
+            self._uniform_buffer = self.rng.uniform(size=_RNG_BLOCK).tolist()
+        return self._uniform_buffer.pop()
+
+    def _sample_indices_batch(self, len_route: int, size: int) -> tuple[np.ndarray, np.ndarray]:
+        """Vectorised version of :py:meth:`_sample_indices`, which samples ``size`` pairs of indices at once."""
+        i = self.rng.integers(1, len_route, size=size)
+        j = self.rng.integers(1, len_route - 1, size=size)
+        return i, j + (j >= i)
+
+    def _sample_route_indices(self, route: _Route) -> tuple[int, int]:
+        """
+        Samples the two indices of a move on ``route``. Without neighbour lists they are given by
+        :py:meth:`_sample_indices`, otherwise the second index is the position of a random neighbour of the city at
+        the first index.
+        """
+        if self.neighbours is None:
+            return self._sample_indices(len(route))
+        # The second index of the pair is only used if the neighbour is the first city, which is kept fixed
+        i, j = self._sample_indices(len(route))
+        neighbours = self.neighbours[route[i]]
+        j_neighbour = self._route_positions(route)[neighbours[int(self._uniform() * len(neighbours))]]
+        return i, (int(j_neighbour) if j_neighbour != 0 else j)
+
+    def _route_positions(self, route: _Route) -> np.ndarray:
+        """
+        Returns the position of each city in ``route``. They are kept for the last route given to the kernel, and if
+        ``route`` is the one sampled by the last move (i.e. the move was accepted), only the positions of the cities
+        moved are updated. Otherwise, they are computed again.
+        """
+        if route is not self._positions_route:
+            if self._last_move is not None and route is self._last_move[0]:
+                moved = self._moved_indices(*self._last_move[1:])
+                self._positions[route[moved]] = moved
+            else:
+                self._positions = np.empty(len(route), dtype=np.intp)
+                self._positions[route] = np.arange(len(route))
+            self._positions_route, self._last_move = route, None
+        return self._positions
+
+    def _sample_move(self, route: _Route) -> tuple[_Route, int, int]:
+        """
+        Samples a new route with the method ``_sample`` of the kernels that move a pair of cities. Returns it with the
+        indices of the move.
+        """
+        i, j = self._sample_route_indices(route)
+        new_route = self._sample(route, i, j)
+        if self.neighbours is not None:
+            # The positions of the cities in the new route are updated from this move, if it is accepted
+            self._last_move = (new_route, i, j)
+        return new_route, i, j
+
+    @staticmethod
+    def _moved_indices(i: int, j: int) -> np.ndarray:
+        """The indices of the cities moved by ``_sample`` with the indices ``i`` and ``j``."""
+        return np.arange(min(i, j), max(i, j) + 1)
+
+    def _sample_route_indices_batch(self, route: _Route, size: int) -> tuple[np.ndarray, np.ndarray]:
+        """Vectorised version of :py:meth:`_sample_route_indices`, which samples ``size`` pairs of indices at once."""
+        len_route = len(route)
+        if self.neighbours is None:
+            return self._sample_indices_batch(len_route, size)
+        positions = np.empty(len_route, dtype=np.intp)
+        positions[route] = np.arange(len_route)
+        i = self.rng.integers(1, len_route, size=size)
+        j = positions[self.neighbours[route[i], self.rng.integers(self.neighbours.shape[1], size=size)]]
+        # The first city is kept fixed, so the second index is chosen uniformly instead
+        fixed = np.flatnonzero(j == 0)
+        j_fixed = self.rng.integers(1, len_route - 1, size=len(fixed))
+        j[fixed] = j_fixed + (j_fixed >= i[fixed])
+        return i, j
 
     @abc.abstractmethod
     def sample(self, route: _Route) -> _Route:
         ...
 
+    def sample_delta(self, route: _Route, dist_matrix: np.ndarray) -> tuple[_Route, float]:
+        new_route = self.sample(route)
+        return new_route, route_distance(new_route, dist_matrix) - route_distance(route, dist_matrix)
+
+    def sample_batch(self, route: _Route, size: int) -> np.ndarray:
+        """
+        Samples ``size`` new routes independently, all of them from the same previous route.
+
+        :param route: Previous route.
+        :param size: The number of routes to sample.
+        :return: Array of shape ``(size, len(route))``, with a new route in each row.
+        """
+        new_routes = np.empty((size, len(route)), dtype=route.dtype)
+        for new_route in new_routes:
+            new_route[:] = self.sample(route)
+        return new_routes
+
+    def set_rng(self, rng: Generator):
+        self.rng = rng
+
     def __call__(self, route: _Route) -> _Route:
         return self.sample(route)
 
 
 # Set the similar documentation
+BaseKernelTSP.sample_delta.__doc__ = _sample_delta_doc
+BaseKernelTSP.set_rng.__doc__ = _set_rng_doc
 for _cls in [KernelTSP, BaseKernelTSP]:
     _cls.sample.__doc__ = _sample_doc
     _cls.__call__.__doc__ = _call_doc
@@ -74,17 +235,59 @@ class SwapKernelTSP(BaseKernelTSP):
     e.g.: For a route ``[0, 1, 2, 3, 4, 5, 6, 7, 8, 9]``, if ``i=3`` and ``j=7`` are selected as indices to swap,
     the new route would be ``[0, 1, 2, 7, 4, 5, 6, 3, 8, 9]``.
     """
+    __slots__ = ()
 
     @staticmethod
     def _sample(route: _Route, i: int, j: int) -> _Route:
         """To have a deterministic sampling. Used for testing."""
-        new_route = copy.copy(route)
-        new_route[i], new_route[j] = new_route[j], new_route[i]
+        new_route = route.copy()
+        new_route[i], new_route[j] = route[j], route[i]
         return new_route
 
+    @staticmethod
+    def _moved_indices(i: int, j: int) -> np.ndarray:
+        return np.array((i, j))
+
+    @staticmethod
+    def _delta(route: _Route, dist_matrix: np.ndarray, i: int, j: int) -> float:
+        """Change of the total distance of :py:meth:`_sample`. Only the edges around ``i`` and ``j`` are evaluated."""
+        i, j = min(i, j), max(i, j)
+        if i == j:
+            return 0.
+        len_route = len(route)
+        a, b, c, d = route[i-1], route[i], route[j], route[(j+1) % len_route]
+        if j - i == 1:
+            # Adjacent cities: (a, b, c, d) -> (a, c, b, d)
+            return (dist_matrix[a, c] + dist_matrix[c, b] + dist_matrix[b, d]
+                    - dist_matrix[a, b] - dist_matrix[b, c] - dist_matrix[c, d])
+        if j - i == len_route - 1:
+            # Adjacent cities through the end of the route: (e, c, b, f) -> (e, b, c, f)
+            e, f = route[j-1], route[i+1]
+            return (dist_matrix[e, b] + dist_matrix[b, c] + dist_matrix[c, f]
+                    - dist_matrix[e, c] - dist_matrix[c, b] - dist_matrix[b, f])
+        # Otherwise, the two edges around each city change: (a, b, e) and (f, c, d)
+        e, f = route[i+1], route[j-1]
+        return (dist_matrix[a, c] + dist_matrix[c, e] + dist_matrix[f, b] + dist_matrix[b, d]
+                - dist_matrix[a, b] - dist_matrix[b, e] - dist_matrix[f, c] - dist_matrix[c, d])
+
     def sample(self, route: _Route) -> _Route:
-        i, j = self.rng.choice(len(route)-1, size=2, replace=False) + 1
-        return self._sample(route, i, j)
+        return self._sample_move(route)[0]
+
+    def sample_delta(self, route: _Route, dist_matrix: np.ndarray) -> tuple[_Route, float]:
+        new_route, i, j = self._sample_move(route)
+        return new_route, self._delta(route, dist_matrix, i, j)
+
+    @staticmethod
+    def _sample_batch(route: _Route, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+        """Vectorised version of :py:meth:`_sample`, with a pair of indices for each new route."""
+        new_routes = np.tile(route, (len(i), 1))
+        rows = np.arange(len(i))
+        new_routes[rows, i], new_routes[rows, j] = route[j], route[i]
+        return new_routes
+
+    def sample_batch(self, route: _Route, size: int) -> np.ndarray:
+        i, j = self._sample_route_indices_batch(route, size)
+        return self._sample_batch(route, i, j)
 
 
 class ReversionKernelTSP(BaseKernelTSP):
@@ -94,17 +297,48 @@ class ReversionKernelTSP(BaseKernelTSP):
     e.g.: For a route ``[0, 1, 2, 3, 4, 5, 6, 7, 8, 9]``, if ``i=3`` and ``j=7`` are selected as indices to reverse
     the route, the new route would be ``[0, 1, 2, 7, 6, 5, 4, 3, 8, 9]``.
     """
+    __slots__ = ()
 
     @staticmethod
     def _sample(route: _Route, i: int, j: int) -> _Route:
         i, j = min(i, j), max(i, j)
-        if i == 0:
-            return route[j::-1] + route[j+1:]
-        return route[:i] + route[j:i-1:-1] + route[j+1:]
+        new_route = route.copy()
+        new_route[i:j+1] = route[i:j+1][::-1]
+        return new_route
+
+    @staticmethod
+    def _delta(route: _Route, dist_matrix: np.ndarray, i: int, j: int) -> float:
+        """
+        Change of the total distance of :py:meth:`_sample`. With a symmetric distance matrix only the two edges at
+        the ends of the reversed part change.
+        """
+        i, j = min(i, j), max(i, j)
+        len_route = len(route)
+        if j - i == len_route - 1:
+            # Reversing the whole route gives the same cycle
+            return 0.
+        a, b, c, d = route[i-1], route[i], route[j], route[(j+1) % len_route]
+        return dist_matrix[a, c] + dist_matrix[b, d] - dist_matrix[a, b] - dist_matrix[c, d]
 
     def sample(self, route: _Route) -> _Route:
-        i, j = self.rng.choice(len(route)-1, size=2, replace=False) + 1
-        return self._sample(route, i, j)
+        return self._sample_move(route)[0]
+
+    def sample_delta(self, route: _Route, dist_matrix: np.ndarray) -> tuple[_Route, float]:
+        new_route, i, j = self._sample_move(route)
+        return new_route, self._delta(route, dist_matrix, i, j)
+
+    @staticmethod
+    def _sample_batch(route: _Route, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+        """Vectorised version of :py:meth:`_sample`, with a pair of indices for each new route."""
+        lb, ub = np.minimum(i, j)[:, None], np.maximum(i, j)[:, None]
+        positions = np.arange(len(route))
+        # Inside the reversed part, the position p takes the city at lb + ub - p
+        source = np.where((lb <= positions) & (positions <= ub), lb + ub - positions, positions)
+        return route[source]
+
+    def sample_batch(self, route: _Route, size: int) -> np.ndarray:
+        i, j = self._sample_route_indices_batch(route, size)
+        return self._sample_batch(route, i, j)
 
 
 class InsertionKernelTSP(BaseKernelTSP):
@@ -114,16 +348,57 @@ class InsertionKernelTSP(BaseKernelTSP):
     e.g.: For a route ``[0, 1, 2, 3, 4, 5, 6, 7, 8, 9]``, if ``i=3`` and ``j=7`` are selected as indices to insert
     the city 3 into the place 7, the new route would be ``[0, 1, 2, 4, 5, 6, 7, 3, 8, 9]``.
     """
+    __slots__ = ()
 
     @staticmethod
     def _sample(route: _Route, i, j) -> _Route:
-        new_route = copy.copy(route)
-        new_route.insert(j, new_route.pop(i))
+        # The cities between both indices are shifted by one place, with a single slice copy
+        new_route = route.copy()
+        if i < j:
+            new_route[i:j] = route[i+1:j+1]
+        else:
+            new_route[j+1:i+1] = route[j:i]
+        new_route[j] = route[i]
         return new_route
 
+    @staticmethod
+    def _delta(route: _Route, dist_matrix: np.ndarray, i: int, j: int) -> float:
+        """
+        Change of the total distance of :py:meth:`_sample`. The city at ``i`` is removed from its two edges and placed
+        in the middle of the edge where it is inserted.
+        """
+        len_route = len(route)
+        if i == j or abs(i - j) == len_route - 1:
+            # The route is the same, or it is only rotated
+            return 0.
+        prev_city, city, next_city = route[i-1], route[i], route[(i+1) % len_route]
+        if i < j:
+            a, b = route[j], route[(j+1) % len_route]
+        else:
+            a, b = route[j-1], route[j]
+        return (dist_matrix[prev_city, next_city] + dist_matrix[a, city] + dist_matrix[city, b]
+                - dist_matrix[prev_city, city] - dist_matrix[city, next_city] - dist_matrix[a, b])
+
     def sample(self, route: _Route) -> _Route:
-        i, j = self.rng.choice(len(route)-1, size=2, replace=False) + 1
-        return self._sample(route, i, j)
+        return self._sample_move(route)[0]
+
+    def sample_delta(self, route: _Route, dist_matrix: np.ndarray) -> tuple[_Route, float]:
+        new_route, i, j = self._sample_move(route)
+        return new_route, self._delta(route, dist_matrix, i, j)
+
+    @staticmethod
+    def _sample_batch(route: _Route, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+        """Vectorised version of :py:meth:`_sample`, with a pair of indices for each new route."""
+        i, j = i[:, None], j[:, None]
+        positions = np.arange(len(route))
+        # The cities between both indices are shifted by one place, and the city at i is placed at j
+        source = positions + ((i <= positions) & (positions < j)) - ((j < positions) & (positions <= i))
+        source[np.arange(len(i)), j[:, 0]] = i[:, 0]
+        return route[source]
+
+    def sample_batch(self, route: _Route, size: int) -> np.ndarray:
+        i, j = self._sample_route_indices_batch(route, size)
+        return self._sample_batch(route, i, j)
 
 
 class RandomWalkKernelTSP(BaseKernelTSP):
@@ -131,13 +406,13 @@ class RandomWalkKernelTSP(BaseKernelTSP):
     Kernel that performs a random walk over possible path combinations. Returns a different path than the one
     initially given.
     """
+    __slots__ = ()
 
     def sample(self, route: _Route) -> _Route:
-        len_route = len(route)
-        new_route = route
-        while new_route == route:
-            new_route = route[:1] + list(self.rng.choice(len_route-1, size=len_route-1, replace=False) + 1)
-        return new_route
+        while True:
+            new_route = np.concatenate((route[:1], self.rng.permutation(route[1:])))
+            if not np.array_equal(new_route, route):
+                return new_route
 
 
 class MixingKernelTSP(BaseKernelTSP):
@@ -146,6 +421,8 @@ class MixingKernelTSP(BaseKernelTSP):
     with the weights :math:`\{p_i\}_{i=1}^{3}`, then the resulting new kernel would be
     :math:`K = p_1 K_1 + p_2 K_2 + p_3 K_3`.
     """
+    __slots__ = ("_len_kernels", "probs", "kernels", "_cumsum_p", "_upper_p")
+
     def __init__(
             self,
             kernels: list[KernelTSP] | list[tuple[float, KernelTSP]],
@@ -165,37 +442,66 @@ class MixingKernelTSP(BaseKernelTSP):
         probs = np.asarray(probs) + _EPS * len(probs)
         probs = probs / np.sum(probs)
 
-        # Ordering the array of probabilities
-        indices = []
-        candidates = {i: probs[i] for i in range(len(probs))}
-        while candidates:
-            argmax_candidate = max(candidates, key=candidates.get)
-            indices.append(argmax_candidate)
-            del candidates[argmax_candidate]
+        # Ordering the array of probabilities, from the largest to the smallest (ties keep their order)
+        indices = np.argsort(-probs, kind="stable")
 
         self.probs: np.ndarray = probs.take(indices)
-        self.kernels: list[KernelTSP] = [kernels[i] for i in indices]
+        self.kernels: list[KernelTSP] = [kernels[i] for i in indices.tolist()]
 
-        # Auxiliary variables
+        # Auxiliary variables. The upper bounds of the intervals are frozen into a tuple, so choosing a kernel is a
+        # binary search over Python floats, instead of a loop over the elements of an array.
         self._cumsum_p: np.ndarray = np.concatenate([[0.], np.cumsum(self.probs)])
+        self._upper_p: tuple[float, ...] = tuple(self._cumsum_p[1:].tolist())
 
     def _choose_kernel(self, u: float) -> KernelTSP:
         """Choose a kernel given a number between 0 and 1."""
-        # Case u = 1 ==> Return the last kernel
-        if u == 1.:
-            return self.kernels[-1]
-        kernel = None
-        for i in range(self._len_kernels):
-            lb, ub = self._cumsum_p[i], self._cumsum_p[i+1]
-            if lb <= u < ub:
-                kernel = self.kernels[i]
-                break
-        return kernel
+        # The kernel i is chosen if cumsum_p[i] <= u < cumsum_p[i+1]. The case u = 1 returns the last kernel
+        return self.kernels[min(bisect.bisect_right(self._upper_p, u), self._len_kernels - 1)]
 
     def _sample(self, route: _Route, u: float) -> _Route:
         kernel = self._choose_kernel(u)
         return kernel.sample(route)
 
     def sample(self, route: _Route) -> _Route:
-        u = self.rng.uniform()
+        u = self._uniform()
         return self._sample(route, u)
+
+    def sample_delta(self, route: _Route, dist_matrix: np.ndarray) -> tuple[_Route, float]:
+        kernel = self._choose_kernel(self._uniform())
+        sample_delta = getattr(kernel, "sample_delta", None)
+        if sample_delta is None:
+            # The kernels that only implement the protocol are evaluated on the whole routes
+            return BaseKernelTSP.sample_delta(kernel, route, dist_matrix)
+        return sample_delta(route, dist_matrix)
+
+    def sample_batch(self, route: _Route, size: int) -> np.ndarray:
+        # The kernel of each row is chosen first, and then every kernel samples all of its rows in a single batch
+        choices = np.searchsorted(self._cumsum_p[1:-1], self.rng.uniform(size=size), side="right")
+        new_routes = np.empty((size, len(route)), dtype=route.dtype)
+        for i, kernel in enumerate(self.kernels):
+            rows = np.flatnonzero(choices == i)
+            if len(rows):
+                # The kernels that only implement the protocol sample their rows one by one
+                sample_batch = getattr(kernel, "sample_batch", None)
+                new_routes[rows] = (sample_batch(route, len(rows)) if sample_batch is not None
+                                    else BaseKernelTSP.sample_batch(kernel, route, len(rows)))
+        return new_routes
+
+    def set_rng(self, rng: Generator):
+        super().set_rng(rng)
+        for kernel in self.kernels:
+            _set_kernel_rng(kernel, rng)
+
+    set_rng.__doc__ = _set_rng_doc
+
+
+def _set_kernel_rng(kernel: KernelTSP, rng: Generator):
+    """
+    Calls :py:meth:`BaseKernelTSP.set_rng` of ``kernel``, or replaces its attribute ``rng`` if it only implements the
+    protocol :py:class:`KernelTSP`.
+    """
+    set_rng = getattr(kernel, "set_rng", None)
+    if set_rng is None:
+        kernel.rng = rng
+    else:
+        set_rng(rng)
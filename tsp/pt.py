@@ -0,0 +1,121 @@
+from typing import Optional
+
+import numpy as np
+from numpy.random import Generator
+
+from tsp.kernels import SwapKernelTSP, KernelTSP
+from tsp.sa import SimulatedAnnealingTSP, _copy_chain
+from tsp.utils import _Route, _GeneratorLike, _ArrayLike, constant_cooling_schedule
+
+__all__ = [
+    "ParallelTemperingTSP",
+]
+
+
+class ParallelTemperingTSP:
+    r"""
+    The Parallel Tempering (or replica exchange) algorithm for solving the Traveling Salesman Problem.
+
+    It runs a replica of the Metropolis algorithm at each temperature :math:`T_1 < \ldots < T_M`. Every
+    ``swap_interval`` iterations, the routes of the replicas at neighbouring temperatures are exchanged with
+    probability
+
+    .. math::
+        \min\left(1, \exp\left((1/T_i - 1/T_{i+1}) (E_i - E_{i+1})\right)\right)
+
+    so the good routes found at high temperatures descend to the low ones, and the routes stuck in a local minimum at
+    low temperatures are moved up. Each replica is a :py:class:`tsp.sa.SimulatedAnnealingTSP` with a
+    :py:class:`tsp.utils.constant_cooling_schedule`, so it uses the same kernels (and compiled loop) as the simulated
+    annealing.
+    """
+    def __init__(
+            self,
+            dist_matrix: _ArrayLike,
+            temps: Optional[_ArrayLike] = None,
+            n_rounds: int = 1_000,
+            swap_interval: int = 100,
+            kernel: Optional[KernelTSP] = None,
+            seed: _GeneratorLike = None,
+            dtype: np.dtype | type = np.float64,
+            track_stats: bool = True,
+    ):
+        """
+        Class initialiser.
+
+        :param dist_matrix: Matrix of distances. Must be a two-dimensional square matrix. It is normalised as in
+            :py:class:`tsp.sa.SimulatedAnnealingTSP`, so the temperatures are relative to the longest distance.
+        :param temps: The temperatures of the replicas, in any order. Default is 8 temperatures geometrically spaced
+            between 0.001 and 0.1.
+        :param n_rounds: The number of rounds to run the algorithm. In each round every replica runs
+            ``swap_interval`` iterations, and then the exchanges are proposed.
+        :param swap_interval: The number of iterations of each replica between exchanges.
+        :param kernel: The kernel of the replicas. This can be any of the :py:mod:`tsp.kernels`. Each replica uses a
+            copy of it. The default is :py:class:`tsp.kernels.SwapKernelTSP`.
+        :param seed: Seed or generator. The kernel generator will be used if this parameter is None. As in
+            :py:class:`tsp.sa.SimulatedAnnealingTSP`, the results also depend on whether Numba is installed.
+        :param dtype: The floating type used to store the distance matrix. Default is ``np.float64``.
+        :param track_stats: Whether to store the statistics of every iteration of the coldest replica (see
+            :py:attr:`tsp.sa.SimulatedAnnealingTSP.values`). The other replicas never store them, so the memory used
+            does not grow with the iterations of every replica. Default is True.
+        """
+        temps = np.sort(np.asarray(temps if temps is not None else np.geomspace(0.001, 0.1, 8), dtype=np.float64))
+        if temps.ndim != 1 or len(temps) < 2:
+            raise ValueError(f"There must be at least two temperatures, not {temps.shape}.")
+        if temps[0] <= 0:
+            raise ValueError(f"The temperatures must be positive, not {temps[0]}.")
+        self.temps: np.ndarray = temps
+        self.n_rounds: int = n_rounds
+
+        # The replicas are copies of the same model, which share its distance matrix and spawn its generator
+        model_sa = SimulatedAnnealingTSP(
+            dist_matrix, n_iter=swap_interval, kernel=kernel or SwapKernelTSP(seed), early_stop=False, seed=seed,
+            dtype=dtype, track_stats=False,
+        )
+        self.dist_matrix: np.ndarray = model_sa.dist_matrix
+        self.rng: Generator = model_sa.rng
+        self.replicas: list[SimulatedAnnealingTSP] = [_copy_chain(model_sa, rng) for rng in self.rng.spawn(len(temps))]
+        for replica, temp in zip(self.replicas, temps):
+            replica.temp = constant_cooling_schedule(temp)
+        self.replicas[0]._track_stats = track_stats
+
+        # For statistics
+        self._n_swaps: np.ndarray = np.zeros(len(temps) - 1, dtype=np.int64)
+        self._n_rounds_done: int = 0
+
+    @property
+    def best_route(self) -> _Route:
+        """The best route found by the replicas."""
+        return min(self.replicas, key=lambda replica: replica.best_value).best_route
+
+    @property
+    def best_value(self) -> float:
+        """The best value found by the replicas."""
+        return min(replica.best_value for replica in self.replicas)
+
+    @property
+    def swap_ratio(self) -> np.ndarray:
+        """The ratio of accepted exchanges between each pair of neighbouring temperatures."""
+        return self._n_swaps / max(self._n_rounds_done, 1)
+
+    def _swap(self):
+        """Proposes the exchanges of the routes of the replicas at neighbouring temperatures."""
+        inv_temps = 1. / self.temps
+        uniforms = self.rng.uniform(size=len(self.replicas) - 1)
+        for i, (cold, hot) in enumerate(zip(self.replicas[:-1], self.replicas[1:])):
+            log_accept_prob = (inv_temps[i] - inv_temps[i + 1]) * (cold._last_value - hot._last_value)
+            if log_accept_prob >= 0 or uniforms[i] <= np.exp(log_accept_prob):
+                self._n_swaps[i] += 1
+                # The replicas resume from the last route of each other
+                cold._last_route, hot._last_route = hot._last_route, cold._last_route
+                cold._last_value, hot._last_value = hot._last_value, cold._last_value
+
+    def run(self):
+        """Execute the algorithm. It can be resumed by calling it again."""
+        for _ in range(self.n_rounds):
+            for replica in self.replicas:
+                replica.run()
+            self._swap()
+            self._n_rounds_done += 1
+        # The routes received in the last exchanges are considered for the best routes
+        for replica in self.replicas:
+            replica._update_best_route(replica._last_route, replica._last_value)
@@ -1,21 +1,31 @@
-from collections import deque
+import copy
+import math
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from typing import Optional
 
-import matplotlib as mpl
-import matplotlib.pyplot as plt
 import numpy as np
-import seaborn as sns
 from numpy.random import Generator
 
-from tsp.kernels import SwapKernelTSP, KernelTSP
-from tsp.utils import _Route, _GeneratorLike, _EPS, exponential_cooling_schedule, cooling_schedule_function, _ArrayLike, \
-    _LiteralStyles
+from tsp.kernels import SwapKernelTSP, KernelTSP, _set_kernel_rng
+from tsp.utils import _Route, _ROUTE_DTYPE, _GeneratorLike, _EPS, exponential_cooling_schedule, \
+    cooling_schedule_function, _ArrayLike, _LiteralStyles, njit, route_distance, greedy_route, \
+    distance_matrix
 
 __all__ = [
     "SimulatedAnnealingTSP",
     "plot_summary_sa",
 ]
 
+_STATS_BLOCK = 1 << 16
+"""Initial number of iterations preallocated for the statistics of a run."""
+
+_SCATTER_POINTS = 10_000
+"""Maximum number of acceptance probabilities drawn by :py:func:`plot_summary_sa`."""
+
+_RESYNC_EVERY = 1 << 14
+"""Number of iterations after which the distance of the current route is recomputed from scratch, to discard the
+rounding errors accumulated by the incremental updates."""
+
 
 class SimulatedAnnealingTSP:
     """
@@ -32,7 +42,10 @@ class SimulatedAnnealingTSP:
             kernel: Optional[KernelTSP] = None,
             early_stop: bool = True,
             stop_after: int = 10_000,
-            seed: _GeneratorLike = None
+            seed: _GeneratorLike = None,
+            dtype: np.dtype | type = np.float64,
+            greedy_init: bool = False,
+            track_stats: bool = True,
     ):
         """
         Class initialiser.
@@ -46,10 +59,23 @@ class SimulatedAnnealingTSP:
         :param early_stop: In case it is desired to stop iterations before reaching the maximum number of iterations.
         default is True.
         :param stop_after: The number of iterations to stop iterations, if no other route has been accepted.
-        :param seed: Seed or generator. The kernel generator will be used if this parameter is None.
+        :param seed: Seed or generator. If it is given, it replaces the generator of the kernel, so a single generator
+            drives the whole chain. The kernel generator will be used if this parameter is None. The same seed
+            gives the same results in the same environment, but the loop compiled by Numba draws the random numbers in
+            a different order than the Python loop (see :py:meth:`run`), so the results also depend on whether Numba
+            is installed.
+        :param dtype: The floating type used to store the distance matrix. ``np.float32`` halves the memory read at
+            every iteration; the distances of the routes are accumulated in double precision anyway. Default is
+            ``np.float64``.
+        :param greedy_init: Whether to start from the route of the nearest neighbour heuristic (see
+            :py:func:`tsp.utils.greedy_route`) instead of the cities in order. Default is False.
+        :param track_stats: Whether to store the statistics of every iteration (see :py:attr:`values`,
+            :py:attr:`accept_prob`, :py:attr:`accept_ratio` and :py:func:`plot_summary_sa`). Otherwise only the best
+            route is kept, and the memory used does not grow with the iterations. Default is True.
         """
-        # Define the distance matrix and some asserts.
-        self.dist_matrix: np.ndarray = np.asarray(dist_matrix)
+        # Define the distance matrix and some asserts. The matrix is converted once into a contiguous float array
+        # owned by the instance, so the normalisation below does not modify the array given by the user.
+        self.dist_matrix: np.ndarray = np.array(dist_matrix, dtype=np.float64, order="C")
         if len(self.dist_matrix.shape) != 2:
             raise ValueError("The distance matrix must have dimension 2,"
                              f" not {len(self.dist_matrix.shape)}.")
@@ -57,8 +83,13 @@ class SimulatedAnnealingTSP:
         if n != m:
             raise ValueError(f"The distance matrix must be square, not {n, m}.")
 
-        # Normalise the distance matrix for stability
+        # Normalise the distance matrix for stability, and store it with the requested precision
         self.dist_matrix /= np.max(self.dist_matrix)
+        self.dist_matrix = self.dist_matrix.astype(dtype, copy=False)
+
+        # The kernels compute the change of distance of a new route from the edges they modify, which assumes a
+        # symmetric matrix. Otherwise, the whole routes are evaluated.
+        self._symmetric: bool = np.array_equal(self.dist_matrix, self.dist_matrix.T)
 
         # Define the length of the route.
         self.len_route = n
@@ -69,30 +100,52 @@ class SimulatedAnnealingTSP:
         # Set the kernel. Default is SwapKernelTSP.
         self.kernel: KernelTSP = kernel or SwapKernelTSP(seed)
 
-        # Set the generator. Default is the kernel generator.
+        # Set the generator. Default is the kernel generator. Otherwise the kernel also draws from it, since a kernel
+        # seeded with the same seed would produce the same numbers as the acceptance draws.
         self.rng: Generator = np.random.default_rng(seed)
         if seed is None:
             self.rng = self.kernel.rng
+        else:
+            _set_rng(self, self.rng)
 
+        self._greedy_init = greedy_init
+        self._track_stats = track_stats
         self._early_stop = early_stop
         self._stop_after = stop_after
 
-        # For statistics
-        self._log_accept_prob: list[float] = []
+        # For statistics. They are stored in preallocated arrays, of which only the first `_n_stats` iterations are
+        # valid (`_values` also stores the value of the initial route).
+        self._log_accept_prob: np.ndarray = np.empty(0)
         self._n_accept: int = 0
-        self._acceptance_ratio: list[float] = []
-        self._values: list[float] = []
+        self._acceptance_ratio: np.ndarray = np.empty(0)
+        self._values: np.ndarray = np.empty(1)
         self._best_route: dict[str, float | _Route | None] = {
             "value": float("inf"),
             "route": None,
         }
         self._last_route = None
+        self._last_value = None
         self._last_k = 0
+        self._n_stats = 0
+        # The statistics derived from the buffers are computed once after each run, on the first access
+        self._derived_stats: dict[str, np.ndarray] = {}
+
+    @classmethod
+    def from_coords(cls, coords: _ArrayLike, **kwargs) -> "SimulatedAnnealingTSP":
+        """
+        Create an instance from the coordinates of the cities, with the euclidean distances between them.
+
+        :param coords: Coordinate array of shape ``(n_coord, n_dim)``.
+        :param kwargs: The other parameters of the class initialiser.
+        :return: The instance.
+        """
+        # The matrix is computed directly with the precision of the instance (see `tsp.utils.distance_matrix`)
+        return cls(distance_matrix(coords, dtype=kwargs.get("dtype", np.float64)), **kwargs)
 
     @property
     def values(self) -> np.ndarray:
         """The values of the total distances of the routes."""
-        return np.array(self._values[1:])
+        return self._values[1:self._n_stats + 1]
 
     @property
     def best_route(self) -> _Route:
@@ -107,17 +160,21 @@ class SimulatedAnnealingTSP:
     @property
     def accept_prob(self) -> np.ndarray:
         """The acceptance probability history."""
-        return np.exp(np.array(self._log_accept_prob))
+        if "accept_prob" not in self._derived_stats:
+            self._derived_stats["accept_prob"] = np.exp(self._log_accept_prob[:self._n_stats])
+        return self._derived_stats["accept_prob"]
 
     @property
     def accept_ratio(self) -> np.ndarray:
         """The probability of acceptance through the iterations."""
-        return np.array(self._acceptance_ratio)
+        return self._acceptance_ratio[:self._n_stats]
 
     @property
     def abs_min_values(self) -> np.ndarray:
         """The absolute minimum value."""
-        return np.minimum.accumulate(self.values)
+        if "abs_min_values" not in self._derived_stats:
+            self._derived_stats["abs_min_values"] = np.minimum.accumulate(self.values)
+        return self._derived_stats["abs_min_values"]
 
     def dist_route(self, route: _Route) -> float:
         r"""
@@ -133,65 +190,288 @@ class SimulatedAnnealingTSP:
         :param route: The route to compute the total distance.
         :return: The total distance.
         """
-        rot_route = deque(route)
-        rot_route.rotate(-1)
-        total_dist = sum([self.dist_matrix[i, j] for i, j in zip(route, rot_route)])
-        return total_dist
+        return route_distance(route, self.dist_matrix)
 
     def _init_route(self):
         """Compute the initial route."""
         if self._last_route is not None:
             return self._last_route
 
-        route_to_return = list(range(self.len_route))
+        if self._greedy_init:
+            return greedy_route(self.dist_matrix)
+
+        route_to_return = np.arange(self.len_route, dtype=_ROUTE_DTYPE)
 
         return route_to_return
 
-    def _register_route(self, route: _Route):
-        """Records route properties for later statistical purposes."""
-        dist_route = self.dist_route(route)
-        self._values.append(dist_route)
-        return route, dist_route
+    def _reserve_statistics(self, n_iterations: int) -> int:
+        """Grows the arrays of statistics so that they can store ``n_iterations`` iterations. Returns the capacity."""
+        capacity = len(self._log_accept_prob)
+        if n_iterations > capacity:
+            values = np.empty(n_iterations + 1)
+            values[:capacity + 1] = self._values
+            log_accept_prob = np.empty(n_iterations)
+            log_accept_prob[:capacity] = self._log_accept_prob
+            acceptance_ratio = np.empty(n_iterations)
+            acceptance_ratio[:capacity] = self._acceptance_ratio
+            self._values, self._log_accept_prob, self._acceptance_ratio = values, log_accept_prob, acceptance_ratio
+            capacity = n_iterations
+        return capacity
 
     def _update_best_route(self, route: _Route, dist_route: float):
         """Updates the best route, in case there was one."""
         if dist_route < self._best_route["value"]:
             self._best_route.update(value=dist_route, route=route)
 
+    def _inverse_temperatures(self, start: int, stop: int) -> np.ndarray:
+        """
+        Computes the inverses of the temperatures (plus a small epsilon) of the iterations from ``start`` to ``stop``,
+        so the loop multiplies instead of dividing. The cooling schedule is evaluated once over the whole array of
+        iterations if it supports it, otherwise iteration by iteration.
+        """
+        ks = np.arange(start, stop)
+        try:
+            temps = np.asarray(self.temp(ks), dtype=np.float64)
+        except (TypeError, ValueError):
+            temps = None
+        if temps is None or temps.shape != ks.shape:
+            temps = np.fromiter((self.temp(k) for k in range(start, stop)), dtype=np.float64, count=stop - start)
+        return 1. / (temps + _EPS)
+
     def run(self):
-        """Execute the algorithm."""
+        """
+        Execute the algorithm. It can be resumed by calling it again.
+
+        If Numba is installed, the kernels of :py:mod:`tsp.kernels` that move a pair of cities (and mixtures of them)
+        run in a compiled loop on symmetric matrices, which draws the moves of a whole block of iterations at once.
+        Otherwise, the moves are drawn by the kernels iteration by iteration. Both loops simulate the same chain, but
+        they consume the generators in a different order, so a seed does not give the same routes with and without
+        Numba.
+        """
         # Initial route
-        route, dist_route = self._register_route(self._init_route())
+        route = self._init_route()
+        # When the algorithm is resumed, the distance of the last route is already known
+        dist_route = self._last_value if self._last_route is not None else self.dist_route(route)
         self._update_best_route(route, dist_route)
+        if self._last_k == 0:
+            self._values[0] = dist_route
+
+        # The loop is compiled with Numba if possible
+        codes = None
+        if self._symmetric and njit is not None:
+            # The compiled loop is imported here, so Numba (which is slow to import) is only imported when running
+            from tsp import _numba
+            codes = _numba.kernel_codes(self.kernel)
+        if codes is None:
+            self._last_k, route, dist_route = self._run_python(route, dist_route)
+        else:
+            self._last_k, route, dist_route = self._run_compiled(route, dist_route, codes)
+
+        self._last_route, self._last_value = route, dist_route
+        self._n_stats = self._last_k if self._track_stats else 0
+        self._derived_stats.clear()
+
+    def _run_python(self, route: _Route, dist_route: float) -> tuple[int, _Route, float]:
+        """Executes the iterations of :py:meth:`run` in Python. Returns the last iteration, route and distance."""
+        # Preallocate the statistics. The arrays grow geometrically, so an early stop does not reserve the memory of
+        # every iteration.
+        k_end = self._last_k + self.n_iter
+        track_stats = self._track_stats
+        if track_stats:
+            capacity = self._reserve_statistics(min(k_end, self._last_k + _STATS_BLOCK))
+            values, log_accept_probs, accept_ratios = self._values, self._log_accept_prob, self._acceptance_ratio
+        else:
+            capacity = k_end
+            values, log_accept_probs, accept_ratios = _scratch_statistics()
+        # Position of the first iteration of the block in the statistics (each block overwrites the previous one if
+        # they are not tracked)
+        offset = 0
+
+        # The methods called at every iteration are resolved once, instead of looking up the attributes each time
+        symmetric, dist_matrix = self._symmetric, self.dist_matrix
+        # The change of distance is only used with a symmetric matrix. The kernels that only implement the protocol
+        # `KernelTSP` are evaluated on the whole routes.
+        sample = self.kernel.sample
+        sample_delta = getattr(self.kernel, "sample_delta", None) if symmetric else None
+        use_delta = sample_delta is not None
+        uniform, exp = _uniforms(self.rng).__next__, math.exp
+        early_stop, stop_after = self._early_stop, self._stop_after
+        best_route = self._best_route
+
+        # The temperatures are evaluated in blocks of iterations, so the cooling schedule is not called every time
+        temp_start = temp_stop = self._last_k
+        inv_temps = []
 
         stop_counter = 0
-        for k in range(self._last_k, self.n_iter + self._last_k):
+        k = self._last_k - 1
+        for k in range(self._last_k, k_end):
             stop_counter += 1
-
-            # Sample a new route from the kernel
-            new_route, dist_new_route = self._register_route(self.kernel(route))
+            if k == capacity:
+                capacity = self._reserve_statistics(min(k_end, 2 * capacity))
+                values, log_accept_probs, accept_ratios = self._values, self._log_accept_prob, self._acceptance_ratio
+            if k == temp_stop:
+                temp_start, temp_stop = k, min(k_end, k + _STATS_BLOCK)
+                inv_temps = self._inverse_temperatures(temp_start, temp_stop).tolist()
+                if not track_stats:
+                    offset = k
+
+            # Sample a new route from the kernel, and compute the gap between both distances. The bookkeeping of the
+            # best route is inlined, since this loop runs for every iteration.
+            if use_delta:
+                if k % _RESYNC_EVERY == 0:
+                    dist_route = route_distance(route, dist_matrix)
+                new_route, gap = sample_delta(route, dist_matrix)
+                gap = float(gap)
+                dist_new_route = dist_route + gap
+            else:
+                new_route = sample(route)
+                dist_new_route = route_distance(new_route, dist_matrix)
+                gap = dist_new_route - dist_route
+            values[k - offset + 1] = dist_new_route
 
             # Compute the acceptance probability
-            gap = dist_new_route - dist_route
-            log_accept_prob = 0 if gap <= 0 else -gap / (self.temp(k) + _EPS)
-            self._log_accept_prob.append(log_accept_prob)
+            log_accept_prob = 0 if gap <= 0 else -gap * inv_temps[k - temp_start]
+            log_accept_probs[k - offset] = log_accept_prob
 
-            if log_accept_prob >= 0 or self.rng.uniform() <= np.exp(log_accept_prob):
+            if log_accept_prob >= 0 or uniform() <= exp(log_accept_prob):
                 stop_counter = 0
-                # Update the best route
-                self._update_best_route(route, dist_new_route)
                 self._n_accept += 1
 
                 # Set the new route as the route
                 route, dist_route = new_route, dist_new_route
 
-            self._acceptance_ratio.append(self._n_accept / (k + 1))
-            self._last_k = k + 1
+                # Update the best route
+                if dist_route < best_route["value"]:
+                    best_route.update(value=dist_route, route=route)
 
-            if self._early_stop and stop_counter >= self._stop_after:
+            accept_ratios[k - offset] = self._n_accept / (k + 1)
+
+            if early_stop and stop_counter >= stop_after:
                 break
 
-        self._last_route = route
+        return k + 1, route, dist_route
+
+    def _run_compiled(self, route: _Route, dist_route: float, codes: np.ndarray) -> tuple[int, _Route, float]:
+        """
+        Executes the iterations of :py:meth:`run` with the loop compiled by Numba (see :py:mod:`tsp._numba`), block by
+        block. Returns the last iteration, route and distance.
+        """
+        from tsp import _numba
+
+        # The routes are modified in place by the compiled loop
+        route = route.copy()
+        positions = np.empty(self.len_route, dtype=np.intp)
+        positions[route] = np.arange(self.len_route)
+        best_route = np.array(self._best_route["route"], dtype=route.dtype)
+        best_value = self._best_route["value"]
+        neighbours = _numba.kernel_neighbours(self.kernel)
+
+        k, k_end = self._last_k, self._last_k + self.n_iter
+        capacity = len(self._log_accept_prob)
+        if not self._track_stats:
+            scratch = _scratch_statistics()
+        stop_counter = 0
+        while k < k_end:
+            size = min(k_end - k, _STATS_BLOCK)
+            if self._track_stats:
+                if k + size > capacity:
+                    capacity = self._reserve_statistics(min(k_end, max(2 * capacity, k + size)))
+                offset, stats = 0, (self._values, self._log_accept_prob, self._acceptance_ratio)
+            else:
+                # Each block overwrites the statistics of the previous one
+                offset, stats = k, scratch
+            block_codes, i, j, slots = _numba.sample_moves(self.kernel, codes, neighbours, self.len_route, size)
+            n_done, dist_route, self._n_accept, stop_counter, best_value = _numba.anneal(
+                route, positions, dist_route, self.dist_matrix, neighbours, block_codes, i, j, slots,
+                self.rng.uniform(size=size), self._inverse_temperatures(k, k + size), k, self._n_accept, stop_counter,
+                self._stop_after, self._early_stop, _RESYNC_EVERY, best_route, best_value, *stats, offset,
+            )
+            k += n_done
+            if n_done < size:
+                break
+
+        self._update_best_route(best_route, best_value)
+        return k, route, dist_route
+
+    def run_chains(
+            self, n_chains: int, max_workers: Optional[int] = None, threads: bool = False
+    ) -> "SimulatedAnnealingTSP":
+        """
+        Execute ``n_chains`` independent copies of the algorithm in parallel, and return the one that found the best
+        route. Each chain is a copy of this instance with its own generator spawned from :py:attr:`rng`, so the chains
+        explore different routes but the result remains reproducible given the seed. The routes and statistics of the
+        instance are not modified, but spawning the generators advances the seed sequence of :py:attr:`rng`: each
+        call spawns different generators than the previous one (the draws of :py:meth:`run` are not affected).
+
+        :param n_chains: The number of chains to execute.
+        :param max_workers: The maximum number of processes (or threads). Default is the default of
+            :py:class:`concurrent.futures.ProcessPoolExecutor` (or :py:class:`concurrent.futures.ThreadPoolExecutor`).
+        :param threads: Whether to execute the chains in threads instead of processes. The threads share the distance
+            matrix without sending it to other processes, but they only run in parallel in the loop compiled by Numba,
+            which releases the GIL. Default is False.
+        :return: The chain with the best value.
+        """
+        if threads:
+            chains = [_copy_chain(self, rng) for rng in self.rng.spawn(n_chains)]
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                list(executor.map(SimulatedAnnealingTSP.run, chains))
+        else:
+            # The instance is sent once to each process, and only the generators are sent for each chain
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_chains, initargs=(self,)) as executor:
+                chains = list(executor.map(_run_chain, self.rng.spawn(n_chains)))
+
+        # The chains do not keep the distance matrix of the instance, since it is the same for all of them
+        best_chain = min(chains, key=lambda chain: chain.best_value)
+        best_chain.dist_matrix = self.dist_matrix.copy()
+        return best_chain
+
+
+def _scratch_statistics() -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """The arrays of statistics of a block of iterations, used by :py:meth:`SimulatedAnnealingTSP.run` when they are
+    not tracked."""
+    return np.empty(_STATS_BLOCK + 1), np.empty(_STATS_BLOCK), np.empty(_STATS_BLOCK)
+
+
+def _uniforms(rng: Generator):
+    """Generates uniform numbers in :math:`[0, 1)`, drawn from ``rng`` in blocks to avoid a call per number."""
+    while True:
+        yield from rng.uniform(size=_STATS_BLOCK).tolist()
+
+
+def _set_rng(model_sa: SimulatedAnnealingTSP, rng: Generator):
+    """Set the generator of the model and of every kernel it uses (including the kernels of a mixing kernel)."""
+    model_sa.rng = rng
+    _set_kernel_rng(model_sa.kernel, rng)
+
+
+def _copy_chain(model_sa: SimulatedAnnealingTSP, rng: Generator) -> SimulatedAnnealingTSP:
+    """Copy the model with the generator ``rng``. The copy shares the distance matrix of the model."""
+    dist_matrix = model_sa.dist_matrix
+    chain = copy.deepcopy(model_sa, memo={id(dist_matrix): dist_matrix})
+    _set_rng(chain, rng)
+    return chain
+
+
+_chain_model: Optional[SimulatedAnnealingTSP] = None
+"""The instance copied by the chains of a process of :py:meth:`SimulatedAnnealingTSP.run_chains`."""
+
+
+def _init_chains(model_sa: SimulatedAnnealingTSP):
+    """Initialise a process of :py:meth:`SimulatedAnnealingTSP.run_chains` with the instance to copy."""
+    global _chain_model
+    _chain_model = model_sa
+
+
+def _run_chain(rng: Generator) -> SimulatedAnnealingTSP:
+    """
+    Execute a chain of the algorithm, as a copy of the instance of the process with the generator ``rng``. It is
+    defined at module level to be sent to other processes.
+    """
+    chain = _copy_chain(_chain_model, rng)
+    chain.run()
+    # The chain is sent back without the distance matrix
+    chain.dist_matrix = None
+    return chain
 
 
 def plot_summary_sa(model_sa: SimulatedAnnealingTSP, style: _LiteralStyles = "darkgrid"):
@@ -202,6 +482,10 @@ def plot_summary_sa(model_sa: SimulatedAnnealingTSP, style: _LiteralStyles = "da
     :param model_sa: An instance of :py:class:`SimulatedAnnealingTSP`.
     :param style: The style of the plot. For further information see :func:`seaborn.axes_style`. Default is `darkgrid`.
     """
+    # The plotting libraries are imported here, since they are slow to import and not needed by the algorithm
+    import matplotlib as mpl
+    import matplotlib.pyplot as plt
+    import seaborn as sns
     with sns.axes_style(style):
         fig: mpl.figure.Figure = plt.figure(figsize=(15, 10))
         gs = fig.add_gridspec(3, 1, hspace=0.2)
@@ -211,24 +495,29 @@ def plot_summary_sa(model_sa: SimulatedAnnealingTSP, style: _LiteralStyles = "da
         ax2: mpl.axes.Axes
         ax3: mpl.axes.Axes
 
-        iterations = np.arange(len(model_sa.accept_prob))
+        # Each statistic is read once, as arrays
+        accept_prob, accept_ratio = model_sa.accept_prob, model_sa.accept_ratio
+        values, abs_min_values = model_sa.values, model_sa.abs_min_values
+        iterations = np.arange(len(accept_prob))
 
+        # The scatter draws a marker per point, so at most `_SCATTER_POINTS` equally spaced iterations are drawn
+        stride = max(1, -(-len(accept_prob) // _SCATTER_POINTS))
         ax1.scatter(
-            iterations, model_sa.accept_prob,
+            iterations[::stride], accept_prob[::stride],
             1, marker="x"
         )
         ax1.set_ylabel("Probability")
         ax1.set_title("Acceptance probability across iterations")
 
         ax2.plot(
-            iterations, model_sa.accept_ratio
+            iterations, accept_ratio
         )
         ax2.set_ylabel("Rate")
         ax2.set_title("Acceptance rate across iterations")
 
-        ax3.plot(iterations, model_sa.values)
-        ax3.plot(iterations, model_sa.abs_min_values)
-        ax3.plot(iterations, np.ones_like(model_sa.values) * model_sa.best_value, "--")
+        ax3.plot(iterations, values)
+        ax3.plot(iterations, abs_min_values)
+        ax3.axhline(model_sa.best_value, color="C2", linestyle="--")
         ax3.set_ylabel("Values")
         ax3.set_xlabel("Iterations")
         ax3.set_title("Route values across iterations")
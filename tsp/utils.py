@@ -1,23 +1,36 @@
-import itertools
+import importlib.util
 from typing import Iterable, Optional, Literal, Protocol
 
-import matplotlib.pyplot as plt
 import numpy as np
 import scipy
-import seaborn as sns
 from numpy.random import Generator
 
-_Route = list[int]
+
+
+def _njit(*args, **kwargs):
+    """:py:func:`numba.njit`, which imports Numba on the first call, since it is slow to import."""
+    from numba import njit as numba_njit
+    return numba_njit(*args, **kwargs)
+
+
+# Optional accelerator of the functions evaluated at every iteration. It is None if Numba is not installed.
+njit = _njit if importlib.util.find_spec("numba") is not None else None
+
+_Route = np.ndarray
+_ROUTE_DTYPE = np.int32
 _GeneratorLike = None | int | Generator
 _ArrayLike = np.ndarray | Iterable
 _LiteralStyles = Literal["darkgrid", "whitegrid", "dark", "white", "ticks"]
 
 _EPS = np.finfo(np.float64).eps
+_MAX_LABELS = 200
+"""Maximum number of cities labelled by :py:func:`plot_route`."""
 
 _call_doc = """
         Call method.
         
-        :param int k: The number of the iteration at the temperature :math:`T_k`. 
+        :param int k: The number of the iteration at the temperature :math:`T_k`. It can also be an array of
+            iterations, in which case the temperatures are computed elementwise in a single vectorised pass.
         :return: The temperature at iteration :math:`k`.
         """
 
@@ -27,7 +40,7 @@ class cooling_schedule_function(Protocol):
     """
     Protocol for cooling schedule functions.
     """
-    def __call__(self, k: int) -> float:
+    def __call__(self, k: int | np.ndarray) -> float | np.ndarray:
         ...
 
 
@@ -42,13 +55,14 @@ class logarithmic_cooling_schedule:
     :param T_0: Initial temperature. Default is 25.
     :param k_0: Iteration phase shift. Default is 1
     """
+    __slots__ = ("T_0", "k_0")
 
     def __init__(self, T_0=25, k_0=1):
         self.T_0 = T_0
         self.k_0 = k_0
 
-    def __call__(self, k: int) -> float:
-        return (self.T_0 * np.log(self.k_0)) / (np.log(k + self.k_0))
+    def __call__(self, k: int | np.ndarray) -> float | np.ndarray:
+        return self.T_0 * np.log(self.k_0 + 1) / np.log(k + 1 + self.k_0)
 
 
 # noinspection PyPep8Naming
@@ -63,16 +77,41 @@ class exponential_cooling_schedule:
     :param rho: The decay parameter. The default is 0.99. It is recommended to increase this amount to a value of 0.999
         or 0.9999...
     """
+    __slots__ = ("T_0", "rho")
+
     def __init__(self, T_0=100, rho=0.99):
         self.T_0 = T_0
-        self.rho = 0.99
+        self.rho = rho
 
-    def __call__(self, k: int) -> float:
+    def __call__(self, k: int | np.ndarray) -> float | np.ndarray:
         return self.rho ** k * self.T_0
 
 
+# noinspection PyPep8Naming
+class constant_cooling_schedule:
+    r"""
+    The constant cooling schedule is
+
+    .. math::
+        T_k = T_0
+
+    It is the schedule of each replica of :py:class:`tsp.pt.ParallelTemperingTSP`.
+
+    :param float T_0: The temperature. Default is 1.
+    """
+    __slots__ = ("T_0",)
+
+    def __init__(self, T_0=1):
+        self.T_0 = T_0
+
+    def __call__(self, k: int | np.ndarray) -> float | np.ndarray:
+        return np.full_like(k, self.T_0, dtype=np.float64) if np.ndim(k) else self.T_0
+
+
 # Assign the similar documentation
-for _cls in [cooling_schedule_function, logarithmic_cooling_schedule, exponential_cooling_schedule]:
+for _cls in [
+    cooling_schedule_function, logarithmic_cooling_schedule, exponential_cooling_schedule, constant_cooling_schedule
+]:
     _cls.__call__.__doc__ = _call_doc
 
 
@@ -96,20 +135,101 @@ def sample_coordinates(
 
     rng = np.random.default_rng(seed)
 
-    return rng.choice(list(itertools.product(range(lb, ub + 1), repeat=2)), size=n_samples)
+    # Each point is drawn uniformly (with replacement) from the grid, so its coordinates are independent integers
+    return rng.integers(lb, ub + 1, size=(n_samples, 2))
 
 
-def distance_matrix(coords: _ArrayLike) -> np.ndarray:
+def distance_matrix(coords: _ArrayLike, dtype: np.dtype | type = np.float64) -> np.ndarray:
     """
     Calculate the distance matrix from the coordinates.
 
     :param coords: Coordinate array of shape ``(n_coord, n_dim)``.
+    :param dtype: The floating type of the matrix. ``np.float32`` halves the memory of the matrix. Default is
+        ``np.float64``.
     :return: Distance matrix of shape ``(n_coord, n_coord)``
     """
 
     coords = np.asarray(coords)
 
-    return scipy.spatial.distance_matrix(coords, coords)
+    # `cdist` computes every pair in a single compiled pass, instead of the chunked Python loop of
+    # `scipy.spatial.distance_matrix`.
+    return scipy.spatial.distance.cdist(coords, coords).astype(dtype, copy=False)
+
+
+def nearest_neighbours(dist_matrix: _ArrayLike, k: int = 20) -> np.ndarray:
+    """
+    Computes the ``k`` nearest neighbours of each city, to restrict the moves of the kernels (see
+    :py:class:`tsp.kernels.BaseKernelTSP`).
+
+    :param dist_matrix: Matrix of distances.
+    :param k: The number of neighbours. It is reduced to the number of other cities if there are fewer. Default is 20.
+    :return: Array of shape ``(n_cities, k)``, whose row ``i`` contains the neighbours of the city ``i`` (in no
+        particular order).
+    """
+    dist_matrix = np.array(dist_matrix, dtype=np.float64)
+    # A city is not a neighbour of itself
+    np.fill_diagonal(dist_matrix, np.inf)
+    k = min(k, len(dist_matrix) - 1)
+    return np.argpartition(dist_matrix, k - 1, axis=1)[:, :k].astype(_ROUTE_DTYPE)
+
+
+def greedy_route(dist_matrix: _ArrayLike, start: int = 0) -> _Route:
+    """
+    Builds a route with the nearest neighbour heuristic: starting from the city ``start``, the traveller always goes
+    to the nearest city not visited yet.
+
+    :param dist_matrix: Matrix of distances.
+    :param start: The first city of the route. Default is 0.
+    :return: The route.
+    """
+    dist_matrix = np.asarray(dist_matrix)
+    n = len(dist_matrix)
+    route = np.empty(n, dtype=_ROUTE_DTYPE)
+    route[0] = start
+    visited = np.zeros(n, dtype=bool)
+    visited[start] = True
+    # Each step is a single masked scan of a row, written into a buffer allocated once
+    row = np.empty(n, dtype=np.float64)
+    for k in range(1, n):
+        row[:] = dist_matrix[route[k - 1]]
+        row[visited] = np.inf
+        city = row.argmin()
+        route[k] = city
+        visited[city] = True
+    return route
+
+
+def route_distance(route: _Route, dist_matrix: np.ndarray) -> float:
+    r"""
+    Compute the total distance of a closed route. If the route is of the form :math:`x = (x_0, \ldots, x_n)`, then
+    the total distance is :math:`\sum_{k=0}^{n} d(x_k, x_{k+1})`, with the convention that :math:`x_{n+1} = x_0`.
+    It is compiled with Numba if it is installed.
+
+    :param route: The route.
+    :param dist_matrix: Matrix of distances.
+    :return: The total distance.
+    """
+    return float(_route_distance(np.asarray(route), dist_matrix))
+
+
+def _route_distance_numpy(route: _Route, dist_matrix: np.ndarray) -> float:
+    # The sum is accumulated in double precision, even if the matrix is stored in single precision
+    return dist_matrix[route[:-1], route[1:]].sum(dtype=np.float64) + dist_matrix[route[-1], route[0]]
+
+
+def _route_distance_loop(route: _Route, dist_matrix: np.ndarray) -> float:
+    # Same as `_route_distance_numpy`, as a loop without temporary arrays to be compiled
+    total_dist = 0.
+    for k in range(len(route) - 1):
+        total_dist += dist_matrix[route[k], route[k + 1]]
+    return total_dist + dist_matrix[route[-1], route[0]]
+
+
+def _route_distance(route: _Route, dist_matrix: np.ndarray) -> float:
+    # The implementation is chosen (and compiled) on the first call, so importing the package does not import Numba
+    global _route_distance
+    _route_distance = _route_distance_numpy if njit is None else njit(cache=True)(_route_distance_loop)
+    return _route_distance(route, dist_matrix)
 
 
 def plot_route(
@@ -128,11 +248,14 @@ def plot_route(
     :param ub: Upper bound.
     :param style: The style of the plot. For further information see :func:`seaborn.axes_style`
     """
+    # The plotting libraries are imported here, since they are slow to import and not needed by the algorithm
+    import matplotlib.pyplot as plt
+    import seaborn as sns
 
-    route = route if route is not None else list(range(len(coords)))
+    route = np.asarray(route) if route is not None else np.arange(len(coords))
 
     coords = np.asarray(coords)
-    coords_ = coords.take(route + route[:1], 0)
+    coords_ = coords.take(np.concatenate((route, route[:1])), 0)
     x, y = coords_[:, 0], coords_[:, 1]
     point_labels = [str(i) for i in range(len(route))]
 
@@ -140,8 +263,9 @@ def plot_route(
         plt.plot(x, y, "--b", alpha=0.5)
         plt.scatter(x, y, 100, c="r", alpha=0.7)
 
-        for i, lab in enumerate(point_labels):
-            plt.text(coords[i, 0], coords[i, 1] + 0.5, lab,
+        # Each label is a separate artist, so at most `_MAX_LABELS` equally spaced cities are labelled
+        for i in range(0, len(point_labels), max(1, -(-len(point_labels) // _MAX_LABELS))):
+            plt.text(coords[i, 0], coords[i, 1] + 0.5, point_labels[i],
                      horizontalalignment='center', size='medium', color='black', weight='semibold')
 
         plt.xlim([lb, ub])